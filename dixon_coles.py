@@ -5,7 +5,7 @@ Fits attack/defense parameters and rho (low-scoring draw correlation) via MLE.
 """
 
 import math
-from collections import defaultdict
+import numpy as np
 from typing import Dict, List, Tuple
 
 
@@ -26,101 +26,150 @@ class DixonColesModel:
                         = 1                                otherwise
     """
 
-    def __init__(self, rho: float = -0.05):
+    def __init__(self, rho: float = -0.05, seed=None):
         self.attack: Dict[str, float] = {}
         self.defense: Dict[str, float] = {}
         self.home_adv: float = 0.3  # home advantage in log-space
         self.intercept: float = 0.0  # baseline scoring rate (gamma)
         self.rho: float = rho  # low-scoring dependence parameter
+        self.rng = np.random.default_rng(seed)  # for simulate_match
 
-    def fit(self, matches: List[dict], epochs: int = 100, lr: float = 0.01):
+    def fit(self, matches: List[dict], epochs: int = 100, lr: float = 0.01, tol: float = 1e-6):
         """
         Fit attack/defense parameters via gradient descent on log-likelihood.
 
         matches: list of dicts with 'home', 'away', 'home_goals', 'away_goals'
-        """
-        teams = set()
-        for m in matches:
-            teams.add(m['home'])
-            teams.add(m['away'])
-
-        # Initialize parameters
-        for t in teams:
-            self.attack[t] = 0.0
-            self.defense[t] = 0.0
+        tol: stop before `epochs` once no parameter moves by more than this in an epoch
 
+        Refitting warm-starts from the current parameters: home advantage,
+        intercept and rho carry over, as do attack/defense of teams already fitted.
+        A cold fit instead starts from the independent-Poisson solution (_poisson_init).
+        """
+        if not matches:
+            return
         n = len(matches)
+        # Sorted team names and every home/away slot's index into them, in one pass
+        names = np.array([m['home'] for m in matches] + [m['away'] for m in matches])
+        teams, codes = np.unique(names, return_inverse=True)
+        teams = teams.tolist()
+        n_teams = len(teams)
+
+        # Matches as parallel arrays, so each epoch is a handful of vector ops
+        hi, ai = codes[:n], codes[n:]
+        x = np.fromiter((m['home_goals'] for m in matches), float, count=n)
+        y = np.fromiter((m['away_goals'] for m in matches), float, count=n)
+        # Low-scoring results that get a τ correction, as index arrays so each
+        # epoch gathers only those matches instead of re-scanning boolean masks
+        m00, m01 = np.flatnonzero((x == 0) & (y == 0)), np.flatnonzero((x == 0) & (y == 1))
+        m10, m11 = np.flatnonzero((x == 1) & (y == 0)), np.flatnonzero((x == 1) & (y == 1))
+
+        # Initialize parameters, from a previous fit where there is one
+        if any(t in self.attack for t in teams):
+            attack = np.fromiter((self.attack.get(t, 0.0) for t in teams), float, count=n_teams)
+            defense = np.fromiter((self.defense.get(t, 0.0) for t in teams), float, count=n_teams)
+        else:
+            attack, defense = self._poisson_init(hi, ai, x, y, n_teams)
+
+        # Home then away residuals share one buffer, so each of attack and defense
+        # gradients is a single bincount over the matching concatenated team index
+        resid = np.empty(2 * n)
+        d_lh, d_la = resid[:n], resid[n:]
+        att_idx, def_idx = np.concatenate((hi, ai)), np.concatenate((ai, hi))
         for epoch in range(epochs):
-            grad_att = defaultdict(float)
-            grad_def = defaultdict(float)
-            grad_ha = 0.0
-            grad_int = 0.0
-            grad_rho = 0.0
-            total_ll = 0.0
-
-            for m in matches:
-                h, a = m['home'], m['away']
-                x, y = m['home_goals'], m['away_goals']
-
-                att_h = self.attack[h]
-                def_h = self.defense[h]
-                att_a = self.attack[a]
-                def_a = self.defense[a]
-
-                lambda_h = math.exp(att_h - def_a + self.home_adv + self.intercept)
-                lambda_a = math.exp(att_a - def_h + self.intercept)
-
-                # Log-likelihood: log(Poisson(x|λ_h)) + log(Poisson(y|λ_a)) + log(τ)
-                ll = (x * math.log(max(lambda_h, 1e-10)) - lambda_h +
-                      y * math.log(max(lambda_a, 1e-10)) - lambda_a)
-
-                # τ correction
-                tau = 1.0
-                if x == 0 and y == 0:
-                    tau = max(1e-10, 1.0 - self.rho * lambda_h * lambda_a)
-                elif x == 0 and y == 1:
-                    tau = max(1e-10, 1.0 + self.rho * lambda_h)
-                elif x == 1 and y == 0:
-                    tau = max(1e-10, 1.0 + self.rho * lambda_a)
-                elif x == 1 and y == 1:
-                    tau = max(1e-10, 1.0 - self.rho)
-                ll += math.log(tau)
-                total_ll += ll
-
-                # Gradients for attack/defense
-                # ∂λ_h/∂att_h = λ_h, ∂λ_h/∂def_a = -λ_h
-                d_lh = (x / max(lambda_h, 1e-10) - 1.0) * lambda_h
-                d_la = (y / max(lambda_a, 1e-10) - 1.0) * lambda_a
-
-                grad_att[h] += d_lh
-                grad_def[a] -= d_lh  # defense of away team affects home lambda
-                grad_att[a] += d_la
-                grad_def[h] -= d_la
-                grad_ha += d_lh  # home advantage gradient
-                grad_int += d_lh + d_la
-
-                # τ gradient for rho
-                if x == 0 and y == 0:
-                    grad_rho += -lambda_h * lambda_a / tau
-                elif x == 0 and y == 1:
-                    grad_rho += lambda_h / tau
-                elif x == 1 and y == 0:
-                    grad_rho += lambda_a / tau
-                elif x == 1 and y == 1:
-                    grad_rho += -1.0 / tau
+            lambda_h = np.exp(attack[hi] - defense[ai] + self.home_adv + self.intercept)
+            lambda_a = np.exp(attack[ai] - defense[hi] + self.intercept)
+            lh = np.maximum(lambda_h, 1e-10)
+            la = np.maximum(lambda_a, 1e-10)
+
+            # τ correction; it is 1 (log τ = 0) outside the four low-scoring groups
+            lh00, la00 = lambda_h[m00], lambda_a[m00]
+            lh01, la10 = lambda_h[m01], lambda_a[m10]
+            tau00 = np.maximum(1e-10, 1.0 - self.rho * lh00 * la00)
+            tau01 = np.maximum(1e-10, 1.0 + self.rho * lh01)
+            tau10 = np.maximum(1e-10, 1.0 + self.rho * la10)
+            tau11 = max(1e-10, 1.0 - self.rho)
+
+            # Gradients for attack/defense
+            # ∂λ_h/∂att_h = λ_h, ∂λ_h/∂def_a = -λ_h
+            np.multiply(x / lh - 1.0, lambda_h, out=d_lh)
+            np.multiply(y / la - 1.0, lambda_a, out=d_la)
+
+            grad_att = np.bincount(att_idx, resid, n_teams)
+            # defense of away team affects home lambda
+            grad_def = -np.bincount(def_idx, resid, n_teams)
+            grad_ha = d_lh.sum()  # home advantage gradient
+            grad_int = grad_ha + d_la.sum()
+
+            # τ gradient for rho
+            grad_rho = ((-lh00 * la00 / tau00).sum() + (lh01 / tau01).sum()
+                        + (la10 / tau10).sum() - len(m11) / tau11)
 
             # Update parameters
-            for t in teams:
-                self.attack[t] += lr * grad_att[t] / n
-                self.defense[t] += lr * grad_def[t] / n
-            self.home_adv += lr * grad_ha / n
-            self.intercept += lr * grad_int / n
-            self.rho += lr * grad_rho / n
+            attack += lr * grad_att / n
+            defense += lr * grad_def / n
+            self.home_adv += float(lr * grad_ha / n)
+            self.intercept += float(lr * grad_int / n)
+            self.rho += float(lr * grad_rho / n)
 
             if epoch % 20 == 0:
+                # Log-likelihood: log(Poisson(x|λ_h)) + log(Poisson(y|λ_a)) + log(τ). The
+                # gradients above are analytical, so it is only needed for this report.
+                ll = x * np.log(lh) - lambda_h + y * np.log(la) - lambda_a
+                total_ll = (ll.sum() + np.log(tau00).sum() + np.log(tau01).sum() + np.log(tau10).sum()
+                            + len(m11) * math.log(tau11))
                 avg_ll = total_ll / n
                 print(f"  Epoch {epoch}: avg LL = {avg_ll:.3f}, rho = {self.rho:.4f}")
 
+            # Early stop once the largest update has become negligible
+            max_grad = max(np.abs(grad_att).max(initial=0.0), np.abs(grad_def).max(initial=0.0),
+                           abs(grad_ha), abs(grad_int), abs(grad_rho))
+            if lr * max_grad / n < tol:
+                break
+
+        self.attack.update(zip(teams, attack.tolist()))
+        self.defense.update(zip(teams, defense.tolist()))
+
+    def _poisson_init(self, hi, ai, x, y, n_teams, sweeps: int = 50, tol: float = 1e-5):
+        """
+        Closed-form alternating fit of the model without τ (independent Poissons).
+
+        Given the other blocks, each of attack, defense, home_adv and intercept
+        has an exact maximiser (goals over expected-goal exposure), so a few sweeps
+        of those updates land close to the optimum that gradient steps then refine
+        for rho. Sets home_adv and intercept; returns (attack, defense) arrays.
+        """
+        scored = np.bincount(hi, x, n_teams) + np.bincount(ai, y, n_teams)
+        conceded = np.bincount(ai, x, n_teams) + np.bincount(hi, y, n_teams)
+        # Floor goal counts at half a goal so a team (or side) that never scored stays finite
+        scored, conceded = np.maximum(scored, 0.5), np.maximum(conceded, 0.5)
+        home_goals, all_goals = max(x.sum(), 0.5), max(x.sum() + y.sum(), 0.5)
+        attack, defense = np.zeros(n_teams), np.zeros(n_teams)
+        ha, gamma = self.home_adv, self.intercept
+        for _ in range(sweeps):
+            prev = np.concatenate((attack, defense, [ha, gamma]))
+            # One exp per team, gathered per match, rather than one per match slot
+            e_h, e_a = math.exp(ha + gamma), math.exp(gamma)
+            e_def = np.exp(-defense)
+            attack = np.log(scored / (np.bincount(hi, e_def[ai], n_teams) * e_h
+                                      + np.bincount(ai, e_def[hi], n_teams) * e_a))
+            e_att = np.exp(attack)
+            exp_def = (np.bincount(ai, e_att[hi], n_teams) * e_h
+                       + np.bincount(hi, e_att[ai], n_teams) * e_a) / conceded
+            defense = np.log(exp_def)
+            e_def = 1.0 / exp_def
+            rate_h = e_att[hi] * e_def[ai]
+            rate_a = e_att[ai] * e_def[hi]
+            ha = math.log(home_goals / (rate_h.sum() * e_a))
+            gamma = math.log(all_goals / (rate_h.sum() * math.exp(ha) + rate_a.sum()))
+            # Attack and defense are only defined up to a shared shift; keep both centred
+            gamma += attack.mean() - defense.mean()
+            attack -= attack.mean()
+            defense -= defense.mean()
+            if np.abs(np.concatenate((attack, defense, [ha, gamma])) - prev).max() < tol:
+                break
+        self.home_adv, self.intercept = float(ha), float(gamma)
+        return attack, defense
+
     def predict_goals(self, home: str, away: str) -> Tuple[float, float]:
         """Return expected goals (λ_h, λ_a) for a match."""
         att_h = self.attack.get(home, 0.0)
@@ -135,54 +184,38 @@ class DixonColesModel:
     def score_probability(self, home: str, away: str, max_goals: int = 8) -> dict:
         """Return probability matrix for all scorelines up to max_goals."""
         lh, la = self.predict_goals(home, away)
-        probs = {}
-        for x in range(max_goals + 1):
-            for y in range(max_goals + 1):
-                p = (self._poisson_pmf(x, lh) * self._poisson_pmf(y, la) *
-                     self._tau(x, y, lh, la))
-                probs[(x, y)] = max(0.0, p)
-        return probs
+        goals = range(max_goals + 1)
+        probs = self._score_matrix(lh, la, max_goals)
+        return dict(zip(((x, y) for x in goals for y in goals), probs.ravel().tolist()))
 
     def outcome_probabilities(self, home: str, away: str) -> Tuple[float, float, float]:
         """Return (p_home_win, p_draw, p_away_win)."""
         lh, la = self.predict_goals(home, away)
-        p_h = p_d = p_a = 0.0
-        for x in range(9):
-            for y in range(9):
-                p = (self._poisson_pmf(x, lh) * self._poisson_pmf(y, la) *
-                     self._tau(x, y, lh, la))
-                if x > y:
-                    p_h += p
-                elif x == y:
-                    p_d += p
-                else:
-                    p_a += p
+        probs = self._score_matrix(lh, la, 8)
+        p_h = np.tril(probs, -1).sum()  # rows are home goals, so x > y is below the diagonal
+        p_d = np.trace(probs)
+        p_a = np.triu(probs, 1).sum()
         total = p_h + p_d + p_a
-        return p_h / total, p_d / total, p_a / total
+        return float(p_h / total), float(p_d / total), float(p_a / total)
 
     def simulate_match(self, home: str, away: str) -> Tuple[int, int]:
         """Simulate a single match using fitted parameters."""
-        import random
-        lh, la = self.predict_goals(home, away)
-        return min(random.randint(0, 8), int(random.gauss(lh, math.sqrt(lh)) + 0.5)), \
-               min(random.randint(0, 8), int(random.gauss(la, math.sqrt(la)) + 0.5))
-
-    @staticmethod
-    def _poisson_pmf(k: int, lam: float) -> float:
-        if lam <= 0:
-            return 1.0 if k == 0 else 0.0
-        return math.exp(-lam) * (lam ** k) / math.factorial(k)
-
-    def _tau(self, x: int, y: int, lh: float, la: float) -> float:
-        if x == 0 and y == 0:
-            return max(0.0, 1.0 - self.rho * lh * la)
-        elif x == 0 and y == 1:
-            return max(0.0, 1.0 + self.rho * lh)
-        elif x == 1 and y == 0:
-            return max(0.0, 1.0 + self.rho * la)
-        elif x == 1 and y == 1:
-            return max(0.0, 1.0 - self.rho)
-        return 1.0
+        lam = np.array(self.predict_goals(home, away))
+        cap = self.rng.integers(0, 9, size=2)
+        goals = self.rng.normal(lam, np.sqrt(lam)) + 0.5
+        return min(int(cap[0]), int(goals[0])), min(int(cap[1]), int(goals[1]))
+
+    def _score_matrix(self, lh: float, la: float, max_goals: int) -> np.ndarray:
+        """P(x, y) for x, y in 0..max_goals as an array indexed [home_goals, away_goals]."""
+        k = np.arange(max_goals + 1)
+        factorial = np.cumprod(np.maximum(k, 1), dtype=float)
+        probs = np.outer(math.exp(-lh) * lh ** k / factorial, math.exp(-la) * la ** k / factorial)
+        # τ only touches the 0-0, 0-1, 1-0 and 1-1 cells
+        tau = np.maximum(0.0, [[1.0 - self.rho * lh * la, 1.0 + self.rho * lh],
+                               [1.0 + self.rho * la, 1.0 - self.rho]])
+        c = min(2, max_goals + 1)
+        probs[:c, :c] *= tau[:c, :c]
+        return probs
 
     def team_strength(self, team: str) -> float:
         """Overall team strength = attack - defense."""
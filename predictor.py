@@ -4,11 +4,51 @@ Data-driven Estonian Football Predictor
 Learns all parameters from match data — no hardcoded constants.
 """
 
-import csv, re, math
+import csv, os, re, math
+import numpy as np
 from datetime import datetime
-from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+_ISO_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')     # YYYY-MM-DD
+_US_DATE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{2})')  # MM/DD/YY (old files)
+
+
+@lru_cache(maxsize=32)
+def _read_results(path: str, mtime: float) -> Tuple[tuple, ...]:
+    """Parse a results CSV into (date, home, away, home_goals, away_goals) rows.
+
+    Cached per (path, mtime) so every DataLoader in a process shares one parse
+    of each file; mtime is part of the key so an edited file is re-read.
+    """
+    rows = []
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        col = {name: i for i, name in enumerate(next(reader, []))}
+        i_date = col.get('Date/Time', col.get('Date'))
+        if 'Result' not in col or i_date is None:
+            return ()  # no dated results to learn from (e.g. fixture lists)
+        i_res, i_home, i_away = col['Result'], col['Home'], col['Away']
+        last = max(i_date, i_res, i_home, i_away)
+        dates = {}  # a matchday shares one date string, so parse each distinct one once
+        for row in reader:
+            if len(row) <= last:
+                continue
+            r = row[i_res].strip()
+            if not r or r == '-:-' or r == 'nan':
+                continue
+            s = row[i_date]
+            d = dates[s] if s in dates else dates.setdefault(s, DataLoader._parse_date(s))
+            if not d:
+                continue
+            try:
+                hg, ag = map(int, r.split(':'))
+            except ValueError:
+                continue
+            rows.append((d, row[i_home].strip(), row[i_away].strip(), hg, ag))
+    return tuple(rows)
+
 
 class DataLoader:
     """Load and process match data chronologically."""
@@ -18,37 +58,24 @@ class DataLoader:
         self.teams: set = set()
 
     def load_csv(self, path: str, league: str = None):
-        with open(path, newline='', encoding='utf-8') as f:
-            for row in csv.DictReader(f):
-                date_str = row.get('Date/Time', row.get('Date', ''))
-                d = self._parse_date(date_str)
-                r = str(row.get('Result', '')).strip()
-                if not d or not r or r == '-:-' or r == 'nan':
-                    continue
-                try:
-                    hg, ag = map(int, r.split(':'))
-                except ValueError:
-                    continue
-                home = row['Home'].strip()
-                away = row['Away'].strip()
-                match = {
-                    'date': d, 'home': home, 'away': away,
-                    'home_goals': hg, 'away_goals': ag
-                }
-                if league:
-                    match['league'] = league
-                self.matches.append(match)
-                self.teams.add(home)
-                self.teams.add(away)
+        for d, home, away, hg, ag in _read_results(path, os.path.getmtime(path)):
+            match = {
+                'date': d, 'home': home, 'away': away,
+                'home_goals': hg, 'away_goals': ag
+            }
+            if league:
+                match['league'] = league
+            self.matches.append(match)
+            self.teams.add(home)
+            self.teams.add(away)
 
     @staticmethod
     def _parse_date(s: str) -> datetime | None:
-        # YYYY-MM-DD format
-        m = re.search(r'(\d{4})-(\d{2})-(\d{2})', str(s))
+        s = str(s)
+        m = _ISO_DATE.search(s)
         if m:
             return datetime(int(m.group(1)), int(m.group(2)), int(m.group(3)))
-        # MM/DD/YY format (old files)
-        m = re.search(r'(\d{1,2})/(\d{1,2})/(\d{2})', str(s))
+        m = _US_DATE.search(s)
         if m:
             return datetime(2000 + int(m.group(3)), int(m.group(1)), int(m.group(2)))
         return None
@@ -76,9 +103,9 @@ class ELOEngine:
         return 1.0 / (1.0 + 10.0 ** ((elo_b - elo_a) / 400.0))
 
     def update(self, home: str, away: str, home_goals: int, away_goals: int):
-        """Update ELO from a single match result."""
-        h_elo = self.ratings.get(home, 1500)
-        a_elo = self.ratings.get(away, 1500)
+        """Update ELO from a single match result. Both teams must already be rated (init_teams)."""
+        h_elo = self.ratings[home]
+        a_elo = self.ratings[away]
 
         # Effective ELO includes home advantage
         h_eff = h_elo + self.home_adv
@@ -99,13 +126,16 @@ class ELOEngine:
         if goal_diff >= 2:
             mov = math.sqrt(goal_diff)
 
-        self.ratings[home] = h_elo + self.k * mov * (act_h - exp_h)
-        self.ratings[away] = a_elo + self.k * mov * (act_a - exp_a)
+        new_h = h_elo + self.k * mov * (act_h - exp_h)
+        new_a = a_elo + self.k * mov * (act_a - exp_a)
 
         # Regression to mean
         if self.regression > 0:
-            self.ratings[home] = self.ratings[home] * (1 - self.regression) + 1500 * self.regression
-            self.ratings[away] = self.ratings[away] * (1 - self.regression) + 1500 * self.regression
+            new_h = new_h * (1 - self.regression) + 1500 * self.regression
+            new_a = new_a * (1 - self.regression) + 1500 * self.regression
+
+        self.ratings[home] = new_h
+        self.ratings[away] = new_a
 
     def fit_from_matches(self, matches: List[dict]):
         """Process all matches in order, building ELO history."""
@@ -217,74 +247,79 @@ class ELOEngine:
         # Floor at 0.3
         return max(0.3, base_home), max(0.3, base_away)
 
+    def expected_goals_matrix(self, teams: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized expected_goals for every (home, away) pairing; returns two (T, T) arrays."""
+        elo = np.fromiter((self.ratings.get(t, 1500) for t in teams), np.float32, count=len(teams))
+        elo_diff = (elo[:, None] + self.home_adv - elo[None, :]) / 400.0
+        return np.maximum(0.3, 1.95 + elo_diff * 0.65), np.maximum(0.3, 1.70 - elo_diff * 0.55)
+
+
+@dataclass(slots=True)
+class Prediction:
+    """One recorded prediction; __getitem__ keeps the old dict access r['actual'] / r['probs'] working."""
+    actual: str
+    probs: Tuple[float, float, float]
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
 
 class Backtester:
     """Evaluate predictions against actual outcomes."""
 
     def __init__(self):
-        self.results = []
+        self.results: List[Prediction] = []
 
     def record(self, actual: str, probs: Tuple[float, float, float]):
         """Record one prediction vs actual. actual: 'H','D','A'"""
-        self.results.append({'actual': actual, 'probs': probs})
+        self.results.append(Prediction(actual, probs))
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Predictions as an (n, 3) H/D/A probability array and the matching one-hot outcome mask."""
+        probs = np.array([r.probs for r in self.results], dtype=float).reshape(-1, 3)
+        outcome = np.array([r.actual for r in self.results])[:, None] == np.array(['H', 'D', 'A'])
+        return probs, outcome
 
     def accuracy(self) -> float:
         if not self.results:
             return 0.0
-        correct = sum(1 for r in self.results
-                      if (r['actual'] == 'H' and r['probs'][0] >= r['probs'][1] and r['probs'][0] >= r['probs'][2]) or
-                         (r['actual'] == 'D' and r['probs'][1] >= r['probs'][0] and r['probs'][1] >= r['probs'][2]) or
-                         (r['actual'] == 'A' and r['probs'][2] >= r['probs'][0] and r['probs'][2] >= r['probs'][1]))
-        return correct / len(self.results)
+        probs, outcome = self._arrays()
+        # Correct when the actual outcome got (one of) the highest probabilities
+        correct = (outcome & (probs >= probs.max(axis=1, keepdims=True))).any(axis=1)
+        return float(correct.mean())
 
     def brier_score(self) -> float:
         if not self.results:
             return float('inf')
-        total = 0.0
-        for r in self.results:
-            oh = 1.0 if r['actual'] == 'H' else 0.0
-            od = 1.0 if r['actual'] == 'D' else 0.0
-            oa = 1.0 if r['actual'] == 'A' else 0.0
-            ph, pd, pa = r['probs']
-            total += (ph - oh)**2 + (pd - od)**2 + (pa - oa)**2
-        return total / len(self.results)
+        probs, outcome = self._arrays()
+        return float(((probs - outcome) ** 2).sum(axis=1).mean())
 
     def log_loss(self) -> float:
         if not self.results:
             return float('inf')
-        total = 0.0
+        probs, outcome = self._arrays()
         eps = 1e-15
-        for r in self.results:
-            if r['actual'] == 'H':
-                p = max(eps, r['probs'][0])
-            elif r['actual'] == 'D':
-                p = max(eps, r['probs'][1])
-            else:
-                p = max(eps, r['probs'][2])
-            total += -math.log(p)
-        return total / len(self.results)
+        # Anything that is not H or D is scored as an away win
+        col = np.where(outcome[:, 0], 0, np.where(outcome[:, 1], 1, 2))
+        p = np.maximum(eps, probs[np.arange(len(probs)), col])
+        return float(-np.log(p).mean())
 
     def calibration(self) -> List[Tuple[float, float]]:
         """Return (predicted_prob, actual_freq) pairs for home win calibration."""
-        buckets = defaultdict(list)
-        for r in self.results:
-            bucket = int(r['probs'][0] * 20) / 20  # 0.05 buckets
-            buckets[bucket].append(1.0 if r['actual'] == 'H' else 0.0)
-
-        cal = []
-        for b in sorted(buckets.keys()):
-            avg_prob = b + 0.025
-            actual_freq = sum(buckets[b]) / len(buckets[b])
-            cal.append((avg_prob, actual_freq))
-        return cal
+        if not self.results:
+            return []
+        probs, outcome = self._arrays()
+        bucket = (probs[:, 0] * 20).astype(int)  # 0.05 buckets
+        counts = np.bincount(bucket)
+        home_wins = np.bincount(bucket, weights=outcome[:, 0])
+        used = np.flatnonzero(counts)
+        return list(zip((used / 20 + 0.025).tolist(), (home_wins[used] / counts[used]).tolist()))
 
     def summary(self) -> str:
         n = len(self.results)
         if n == 0:
             return "No predictions recorded."
-        hw = sum(1 for r in self.results if r['actual'] == 'H')
-        dr = sum(1 for r in self.results if r['actual'] == 'D')
-        aw = sum(1 for r in self.results if r['actual'] == 'A')
+        hw, dr, aw = self._arrays()[1].sum(axis=0).tolist()
         acc = self.accuracy()
         brier = self.brier_score()
         ll = self.log_loss()
@@ -1,14 +1,81 @@
 #!/usr/bin/env python3
 """Estonian Football League Table Simulator with promotion/relegation."""
 
+import os
 import numpy as np
 from datetime import datetime
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from predictor import DataLoader, ELOEngine
 
 
+def group_season_matches(matches, team_league_map):
+    """Matches grouped by (year, league of the home team), classified once."""
+    season_matches = defaultdict(list)
+    for m in matches:
+        y = m['date'].year
+        season_matches[(y, team_league_map.get((m['home'], y)))].append(m)
+    return season_matches
+
+
+def remaining_pairings(teams, played):
+    """Games still to be played in the round-robin as team-id arrays (pair_a, pair_b), one entry per game."""
+    idx = {t: i for i, t in enumerate(teams)}
+    n = len(teams)
+    ids = np.array([(idx[m['home']], idx[m['away']]) for m in played
+                    if m['home'] in idx and m['away'] in idx and m['home'] != m['away']], dtype=int).reshape(-1, 2)
+    # required[i, j] (i < j): games left between teams i and j
+    required = np.triu(np.full((n, n), 4), k=1)
+    np.subtract.at(required, (ids.min(axis=1), ids.max(axis=1)), 1)
+    np.maximum(required, 0, out=required)
+
+    pair_a, pair_b = np.nonzero(required)
+    counts = required[pair_a, pair_b]
+    return np.repeat(pair_a, counts), np.repeat(pair_b, counts)
+
+
+def _simulate_chunk(args):
+    """Simulate n_sims remaining seasons; module-level so executor workers can run it.
+
+    args: (base_pts, base_gd, base_gf, pair_a, pair_b, xg_home, xg_away, n_sims, seed)
+    seed: an int seed or a np.random.Generator to draw from.
+    Returns (points, goal_diff, ranks), each of shape (n_sims, n_teams) as int16/int16/int8.
+    """
+    base_pts, base_gd, base_gf, pair_a, pair_b, xg_home, xg_away, n_sims, seed = args
+    rng = np.random.default_rng(seed)
+    n_teams = len(base_pts)
+
+    # All simulations at once: one row per simulated season, one column per remaining game
+    flip = rng.random((n_sims, len(pair_a))) < 0.5
+    home, away = np.where(flip, pair_a, pair_b), np.where(flip, pair_b, pair_a)
+    hg = np.minimum(rng.poisson(xg_home[home, away]), 8)
+    ag = np.minimum(rng.poisson(xg_away[home, away]), 8)
+    gd = hg - ag
+
+    # Per-team totals via one flat bincount, offsetting each sim's team ids into its own row
+    offset = n_teams * np.arange(n_sims)[:, None]
+    h_ids, a_ids = (home + offset).ravel(), (away + offset).ravel()
+    def per_team(ids, weights):
+        return np.bincount(ids, weights=weights.ravel(), minlength=n_sims * n_teams).reshape(n_sims, n_teams)
+
+    pts = base_pts + per_team(h_ids, 3 * (gd > 0) + (gd == 0)) + per_team(a_ids, 3 * (gd < 0) + (gd == 0))
+    gd_tot = base_gd + per_team(h_ids, gd) - per_team(a_ids, gd)
+    gf = base_gf + per_team(h_ids, hg) + per_team(a_ids, ag)
+
+    # Final tables, in numpy's narrow dtypes
+    points = pts.astype(np.int16)
+    goal_diff = gd_tot.astype(np.int16)
+    ranks = np.empty((n_sims, n_teams), dtype=np.int8)
+    tables = np.lexsort((-gf, -gd_tot, -pts), axis=-1)
+    np.put_along_axis(ranks, tables, np.arange(1, n_teams + 1), axis=1)
+
+    return points, goal_diff, ranks
+
+
 class SeasonSimulator:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
         self.loader = DataLoader()
         for fn, lg in [('premium_liiga','PL'),('esiliiga','ESL'),('esiliiga_b','ESB')]:
             for yr in ['2022','2023','2024','2025']:
@@ -24,6 +91,8 @@ class SeasonSimulator:
                 self.team_league_map[(m['home'], y)] = m['league']
                 self.team_league_map[(m['away'], y)] = m['league']
 
+        self.season_matches = group_season_matches(self.all_matches, self.team_league_map)
+
         self.cutoff = datetime(2025, 9, 1)
         self.train = [m for m in self.all_matches if m['date'] < self.cutoff]
         t2025 = [m for m in self.train if m['date'] >= datetime(2025, 1, 1)]
@@ -33,161 +102,111 @@ class SeasonSimulator:
 
     def sim_match(self, home, away):
         hg, ag = self.elo.expected_goals(home, away)
-        return min(np.random.poisson(hg), 8), min(np.random.poisson(ag), 8)
+        return min(self.rng.poisson(hg), 8), min(self.rng.poisson(ag), 8)
 
     def get_league_teams(self, year, league):
         teams = set()
-        for m in self.all_matches:
-            if m['date'].year != year: continue
-            if self.team_league_map.get((m['home'], year)) == league:
-                teams.add(m['home']); teams.add(m['away'])
+        for m in self.season_matches.get((year, league), []):
+            teams.add(m['home']); teams.add(m['away'])
         return teams
 
     def get_played_matches(self, year, league):
-        return [m for m in self.all_matches
-                if m['date'].year == year
-                and m['date'] < self.cutoff
-                and self.team_league_map.get((m['home'], year)) == league]
-
-    def generate_remaining_fixtures(self, teams, played):
-        """Generate random pairings for remaining round-robin matches."""
-        required = {}
-        tl = list(teams)
-        for i, h in enumerate(tl):
-            for a in tl[i+1:]:
-                required[(min(h, a), max(h, a))] = 4
-
-        for m in played:
-            key = (min(m['home'], m['away']), max(m['home'], m['away']))
-            if key in required:
-                required[key] = max(0, required[key] - 1)
-
-        fixtures = []
-        for (t1, t2), count in required.items():
-            for _ in range(count):
-                fixtures.append((t1, t2) if np.random.random() < 0.5 else (t2, t1))
-        np.random.shuffle(fixtures)
-        return fixtures
+        return [m for m in self.season_matches.get((year, league), [])
+                if m['date'] < self.cutoff]
 
     def build_standings(self, teams, played_matches):
-        s = {t: {'pts': 0, 'gd': 0, 'gf': 0, 'ga': 0, 'gp': 0} for t in teams}
-        for m in played_matches:
-            h, a = m['home'], m['away']
-            s[h]['gp'] += 1; s[a]['gp'] += 1
-            gd = m['home_goals'] - m['away_goals']
-            s[h]['gf'] += m['home_goals']; s[h]['ga'] += m['away_goals']
-            s[a]['gf'] += m['away_goals']; s[a]['ga'] += m['home_goals']
-            s[h]['gd'] += gd; s[a]['gd'] -= gd
-            if gd > 0: s[h]['pts'] += 3
-            elif gd < 0: s[a]['pts'] += 3
-            else: s[h]['pts'] += 1; s[a]['pts'] += 1
+        """Standings from played matches as {field: array}, each indexed by position in teams."""
+        idx = {t: i for i, t in enumerate(teams)}
+        n = len(teams)
+        games = np.array([(idx[m['home']], idx[m['away']], m['home_goals'], m['away_goals'])
+                          for m in played_matches], dtype=int).reshape(-1, 4)
+        h, a, hg, ag = games.T
+        gd = hg - ag
+        s = {k: np.zeros(n, dtype=int) for k in ('pts', 'gd', 'gf', 'ga', 'gp')}
+        for k, h_vals, a_vals in (('gp', 1, 1), ('gf', hg, ag), ('ga', ag, hg), ('gd', gd, -gd),
+                                  ('pts', 3 * (gd > 0) + (gd == 0), 3 * (gd < 0) + (gd == 0))):
+            np.add.at(s[k], h, h_vals)
+            np.add.at(s[k], a, a_vals)
         return s
 
     def sort_table(self, standings):
         return sorted(standings.items(),
                      key=lambda x: (-x[1]['pts'], -x[1]['gd'], -x[1]['gf']))
 
-    def simulate_league(self, league_code, league_name, year=2025, n_sims=10000):
+    def simulate_league(self, league_code, league_name, year=2025, n_sims=10000, n_jobs=1, executor=None):
+        """Simulate the rest of a season n_sims times and print the projected table.
+
+        With n_jobs > 1 the seasons are split into n_jobs seeded chunks run on
+        executor, or on a pool made for this call if none is given; pass one
+        executor to several calls to pay for worker start-up only once.
+        """
         teams = self.get_league_teams(year, league_code)
         played = self.get_played_matches(year, league_code)
 
         if len(teams) < 4:
             return None
 
-        base = self.build_standings(teams, played)
+        teams = sorted(teams)
         n_teams = len(teams)
 
-        # Accumulators
-        positions = {t: np.zeros(n_teams + 1) for t in teams}
-        points = {t: [] for t in teams}
-        goal_diff = {t: [] for t in teams}
-        champion = {t: 0 for t in teams}
-        promoted_auto = {t: 0 for t in teams}
-        promoted_total = {t: 0 for t in teams}
-        relegated_auto = {t: 0 for t in teams}
-        relegated_total = {t: 0 for t in teams}
-        playoff_spot = {t: 0 for t in teams}
-
-        for _ in range(n_sims):
-            s = {t: dict(base[t]) for t in teams}
-            fixtures = self.generate_remaining_fixtures(teams, played)
-
-            for h, a in fixtures:
-                hg, ag = self.sim_match(h, a)
-                s[h]['gp'] += 1; s[a]['gp'] += 1
-                s[h]['gf'] += hg; s[h]['ga'] += ag
-                s[a]['gf'] += ag; s[a]['ga'] += hg
-                gd = hg - ag
-                s[h]['gd'] += gd; s[a]['gd'] -= gd
-                if hg > ag: s[h]['pts'] += 3
-                elif ag > hg: s[a]['pts'] += 3
-                else: s[h]['pts'] += 1; s[a]['pts'] += 1
-
-            table = self.sort_table(s)
-
-            for pos, (t, _) in enumerate(table, 1):
-                positions[t][pos] += 1
-                points[t].append(s[t]['pts'])
-                goal_diff[t].append(s[t]['gd'])
-
-                if pos == 1:
-                    champion[t] += 1
-                if pos <= 2:
-                    promoted_auto[t] += 1
-                    promoted_total[t] += 1
-                if pos == 3:
-                    playoff_spot[t] += 1
-                if pos >= n_teams - 1:  # bottom 2 auto-relegated
-                    relegated_auto[t] += 1
-                    relegated_total[t] += 1
-                if pos == n_teams - 2:  # relegation playoff spot
-                    playoff_spot[t] += 1
-
-        # Simulate promotion playoffs (3rd ESL vs 9th PL, 3rd ESB vs 9th ESL)
-        promo_playoff_wins = {t: 0 for t in teams}
-        rel_playoff_wins = {t: 0 for t in teams}
-
-        for _ in range(n_sims):
-            table = self.sort_table({t: {'pts': np.random.choice(points[t]), 'gd': np.random.choice(goal_diff[t]), 'gf': 0} for t in teams})
-
-            third_place = table[2][0]  # 3rd place team
-            ninth_place = table[n_teams - 2][0]  # 2nd-to-last
-
-            # Simulate playoff: two-leg tie
-            agg_home = 0
-            agg_away = 0
-            for leg in range(2):
-                if leg == 0:
-                    hg, ag = self.sim_match(ninth_place, third_place)
-                else:
-                    hg, ag = self.sim_match(third_place, ninth_place)
-                    agg_home = hg
-                    agg_away = ag
-
-            # Simplified: higher league team stays up ~60% of the time
-            if np.random.random() < 0.6:
-                promo_playoff_wins[ninth_place] += 1
-            else:
-                promo_playoff_wins[third_place] += 1
-                promoted_total[third_place] += 1
-                relegated_total[ninth_place] += 1
+        base = self.build_standings(teams, played)
+        base_pts, base_gd, base_gf = base['pts'], base['gd'], base['gf']
+
+        pair_a, pair_b = remaining_pairings(teams, played)
+
+        # Ratings are fixed while simulating, so expected goals are too
+        xg_home, xg_away = self.elo.expected_goals_matrix(teams)
+
+        inputs = (base_pts, base_gd, base_gf, pair_a, pair_b, xg_home, xg_away)
+        if n_jobs > 1:
+            # Independent seeded chunks; seeds come from self.rng so runs stay reproducible
+            sizes = [len(c) for c in np.array_split(np.arange(n_sims), n_jobs)]
+            seeds = self.rng.integers(0, 2**32, size=n_jobs).tolist()
+            pool = ProcessPoolExecutor(max_workers=n_jobs) if executor is None else nullcontext(executor)
+            with pool as ex:
+                parts = list(ex.map(_simulate_chunk, [inputs + (n, seed) for n, seed in zip(sizes, seeds)]))
+            points, goal_diff, ranks = (np.concatenate(p) for p in zip(*parts))
+        else:
+            points, goal_diff, ranks = _simulate_chunk(inputs + (n_sims, self.rng))
+
+        champion = (ranks == 1).sum(axis=0)
+        promoted_total = (ranks <= 2).sum(axis=0)
+        relegated_total = (ranks >= n_teams - 1).sum(axis=0)  # bottom 2 auto-relegated
+        # 3rd place and the relegation playoff spot
+        playoff_spot = ((ranks == 3) | (ranks == n_teams - 2)).sum(axis=0)
+
+        # Simulate promotion playoffs (3rd ESL vs 9th PL, 3rd ESB vs 9th ESL): each team's
+        # points and GD are drawn independently from its simulated seasons, then ranked
+        draw_pts = np.take_along_axis(points, self.rng.integers(0, n_sims, (n_sims, n_teams)), axis=0)
+        draw_gd = np.take_along_axis(goal_diff, self.rng.integers(0, n_sims, (n_sims, n_teams)), axis=0)
+        tables = np.lexsort((-draw_gd, -draw_pts), axis=-1)
+        third_place = tables[:, 2]  # 3rd place team
+        ninth_place = tables[:, n_teams - 2]  # 2nd-to-last
+
+        # Simplified: higher league team stays up ~60% of the time
+        upset = self.rng.random(n_sims) >= 0.6
+        promoted_total += np.bincount(third_place[upset], minlength=n_teams)
+        relegated_total += np.bincount(ninth_place[upset], minlength=n_teams)
+
+        champion, promoted_total, relegated_total, playoff_spot = (
+            dict(zip(teams, c.tolist())) for c in (champion, promoted_total, relegated_total, playoff_spot))
 
         # Display
         print(f"\n{'='*100}")
         print(f"  {league_name} {year} — PROJECTED FINAL TABLE ({n_sims:,} simulations)")
-        remaining = n_teams * (n_teams - 1) * 2 - sum(base[t]['gp'] for t in teams)
+        remaining = n_teams * (n_teams - 1) * 2 - base['gp'].sum()
         print(f"  Based on {len(played)} played + ~{remaining} simulated matches")
         print(f"{'='*100}")
         print(f"  {'Pos':<4} {'Team':<28} {'AvgPts':<8} {'PtRange':<14} {'AvgGD':<8} {'Champion':<9} {'Promoted':<9} {'Relegated':<9} {'Playoff':<8}")
         print(f"  {'-'*97}")
 
-        team_avg_pos = {t: sum(p * positions[t][p] for p in range(1, n_teams+1)) / n_sims for t in teams}
+        # Summary columns for every team at once; rows below only format them
+        avg_pos = ranks.mean(axis=0)
+        avg_pts, min_pts, max_pts = points.mean(axis=0), points.min(axis=0), points.max(axis=0)
+        avg_gd = goal_diff.mean(axis=0)
 
-        for rank, t in enumerate(sorted(teams, key=lambda x: team_avg_pos[x]), 1):
-            avg_pts = np.mean(points[t])
-            mn = np.min(points[t])
-            mx = np.max(points[t])
-            avg_gd = np.mean(goal_diff[t])
+        for rank, i in enumerate(np.argsort(avg_pos, kind='stable'), 1):
+            t = teams[i]
             c_pct = champion[t] / n_sims
             p_pct = promoted_total[t] / n_sims
             r_pct = relegated_total[t] / n_sims
@@ -199,21 +218,24 @@ class SeasonSimulator:
             if r_pct > 0.5: tags += " [RELEGATED]"
             elif r_pct > 0.2: tags += " [danger]"
 
-            print(f"  {rank:<4} {t[:27]:<28} {avg_pts:<8.1f} {mn:4.0f}-{mx:<7.0f} {avg_gd:+8.1f} "
+            print(f"  {rank:<4} {t[:27]:<28} {avg_pts[i]:<8.1f} {min_pts[i]:4.0f}-{max_pts[i]:<7.0f} {avg_gd[i]:+8.1f} "
                   f"{c_pct:<9.1%} {p_pct:<9.1%} {r_pct:<9.1%} {po_pct:<8.1%}{tags}")
 
-        return {t: {'avg_pts': np.mean(points[t]), 'avg_pos': team_avg_pos[t],
+        return {t: {'avg_pts': avg_pts[i], 'avg_pos': avg_pos[i],
                      'champion': champion[t]/n_sims, 'promoted': promoted_total[t]/n_sims,
                      'relegated': relegated_total[t]/n_sims, 'playoff': playoff_spot[t]/n_sims}
-                for t in teams}
+                for i, t in enumerate(teams)}
 
 
 def main():
     sim = SeasonSimulator()
+    n_jobs = os.cpu_count() or 1
 
-    pl = sim.simulate_league('PL', 'PREMIUM LIIGA')
-    esl = sim.simulate_league('ESL', 'ESILIIGA')
-    esb = sim.simulate_league('ESB', 'ESILIIGA B')
+    # One set of workers serves all three leagues
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        pl = sim.simulate_league('PL', 'PREMIUM LIIGA', n_jobs=n_jobs, executor=executor)
+        esl = sim.simulate_league('ESL', 'ESILIIGA', n_jobs=n_jobs, executor=executor)
+        esb = sim.simulate_league('ESB', 'ESILIIGA B', n_jobs=n_jobs, executor=executor)
 
     if pl and esl:
         print(f"\n{'='*100}")
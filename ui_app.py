@@ -5,16 +5,68 @@ Predicts final league tables using Monte Carlo simulation with league-calibrated
 Data: 1997-2025, 29 seasons, 3 leagues, 11,000+ matches.
 """
 
+import threading
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk
 import numpy as np
 from datetime import datetime
-from collections import defaultdict
+from collections import deque
+from dataclasses import dataclass, field
 from predictor import DataLoader, ELOEngine
+from season_sim import group_season_matches, remaining_pairings
+
+# One simulated season's final record for a team; sim_records[team] is a column of these.
+# Narrow fields keep the (n_sims, n_teams) table small for the summary passes over it.
+RECORD_DTYPE = np.dtype([('pos', np.int8)] + [(k, np.int16) for k in ('pts', 'gd', 'gf', 'ga', 'gp', 'w', 'd', 'l')])
+
+
+@dataclass
+class SimRun:
+    """One run_simulation result, published as a whole so a reader never mixes two runs."""
+    league: str
+    n_sims: int
+    teams: list         # sorted; team ids in games index into this
+    sorted_teams: list  # by average finishing position
+    sim_records: dict   # team -> (n_sims,) column of RECORD_DTYPE
+    base: dict          # standings arrays before the simulated games
+    games: tuple        # every simulated game: (home, away, home_goals, away_goals), each (n_sims, n_games)
+    _team_games: dict = field(default_factory=dict, repr=False)
+
+    def team_games(self, team):
+        """(sim, game) index arrays of team's games, in season then game order.
+
+        Built once per team per run, so repeated lookups skip the scan over every simulated game.
+        """
+        if team not in self._team_games:
+            if team not in self.teams: return np.empty(0, int), np.empty(0, int)
+            t = self.teams.index(team); home, away = self.games[:2]
+            self._team_games[team] = np.nonzero((home == t) | (away == t))
+        return self._team_games[team]
+
+    def team_results(self, team):
+        """Team's games as arrays: (sim, opponent id, at_home, goals for, goals against)."""
+        sim, col = self.team_games(team)
+        home, away, hg, ag = self.games
+        at_home = home[sim, col] == (self.teams.index(team) if len(sim) else -1)
+        h, a = hg[sim, col], ag[sim, col]
+        return sim, np.where(at_home, away[sim, col], home[sim, col]), at_home, np.where(at_home, h, a), np.where(at_home, a, h)
+
+    def extreme_results(self, team, k):
+        """Team's k biggest wins and losses as (margin, opponent, score, season) lists."""
+        sim, opp, at_home, gf, ga = self.team_results(team)
+        margin = gf - ga
+        def top(sel, scores):
+            sel = sel[np.argsort(-np.abs(margin[sel]), kind='stable')[:k]]
+            return [(abs(int(margin[i])), self.teams[opp[i]], f"{scores[0][i]}-{scores[1][i]}", int(sim[i]) + 1)
+                    for i in sel]
+        wins = top(np.flatnonzero(margin > 0), (gf, ga))
+        losses = top(np.flatnonzero(margin < 0), (np.where(at_home, gf, ga), np.where(at_home, ga, gf)))
+        return wins, losses
 
 
 class LeagueSimulator:
-    def __init__(self):
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
         self.loader = DataLoader()
         for fn, lg in [('premium_liiga','PL'),('esiliiga','ESL'),('esiliiga_b','ESB')]:
             for yr in ['2022','2023','2024','2025']:
@@ -26,6 +78,7 @@ class LeagueSimulator:
             if 'league' in m:
                 self.team_league_map[(m['home'], y)] = m['league']
                 self.team_league_map[(m['away'], y)] = m['league']
+        self.season_matches = group_season_matches(self.all_matches, self.team_league_map)
         self.cutoff = datetime(2025, 9, 1)
         train = [m for m in self.all_matches if m['date'] < self.cutoff]
         t2025 = [m for m in train if m['date'] >= datetime(2025, 1, 1)]
@@ -33,153 +86,141 @@ class LeagueSimulator:
         self.elo = ELOEngine(k_factor=20, home_advantage=50, draw_rate=dr)
         self.elo.fit_with_league_awareness(train, self.team_league_map)
         self.teams = sorted(set(m['home'] for m in self.all_matches) | set(m['away'] for m in self.all_matches))
-        self.last_results = None; self.last_sim_records = None
-        self.last_game_logs = None; self.last_n_sims = None; self.last_league = None
+        self.last_run = None  # SimRun of the latest run_simulation
 
     def sim_match(self, home, away):
         hg, ag = self.elo.expected_goals(home, away)
-        return min(np.random.poisson(hg), 8), min(np.random.poisson(ag), 8)
+        return min(self.rng.poisson(hg), 8), min(self.rng.poisson(ag), 8)
+
+    def sim_matches(self, home, away, n):
+        """Simulate the same fixture n times; returns home and away goal arrays."""
+        hg, ag = self.elo.expected_goals(home, away)
+        return np.minimum(self.rng.poisson(hg, n), 8), np.minimum(self.rng.poisson(ag, n), 8)
 
     def get_league_data(self, year, league):
-        teams = set(); matches = []
-        for m in self.all_matches:
-            if m['date'].year != year: continue
-            if self.team_league_map.get((m['home'], year)) == league:
-                teams.add(m['home']); teams.add(m['away']); matches.append(m)
-        return teams, matches
+        matches = self.season_matches.get((year, league), [])
+        teams = set(m['home'] for m in matches) | set(m['away'] for m in matches)
+        return teams, list(matches)
 
     def build_standings(self, teams, played):
-        s = {t: {'pts': 0, 'gd': 0, 'gf': 0, 'ga': 0, 'gp': 0, 'w': 0, 'd': 0, 'l': 0} for t in teams}
-        for m in played:
-            h, a = m['home'], m['away']; gd = m['home_goals'] - m['away_goals']
-            s[h]['gf'] += m['home_goals']; s[h]['ga'] += m['away_goals']; s[h]['gp'] += 1; s[h]['gd'] += gd
-            s[a]['gf'] += m['away_goals']; s[a]['ga'] += m['home_goals']; s[a]['gp'] += 1; s[a]['gd'] -= gd
-            if gd > 0: s[h]['pts'] += 3; s[h]['w'] += 1; s[a]['l'] += 1
-            elif gd < 0: s[a]['pts'] += 3; s[a]['w'] += 1; s[h]['l'] += 1
-            else: s[h]['pts'] += 1; s[a]['pts'] += 1; s[h]['d'] += 1; s[a]['d'] += 1
-        return s
-
-    def generate_fixtures(self, teams, played):
-        required = {}
-        tl = list(teams)
-        for i, h in enumerate(tl):
-            for a in tl[i+1:]: required[(min(h,a), max(h,a))] = 4
-        for m in played:
-            key = (min(m['home'],m['away']), max(m['home'],m['away']))
-            if key in required: required[key] = max(0, required[key]-1)
-        fixtures = []
-        for (t1, t2), count in required.items():
-            for _ in range(count):
-                fixtures.append((t1, t2) if np.random.random() < 0.5 else (t2, t1))
-        np.random.shuffle(fixtures)
-        return fixtures
+        """Standings from played matches as {field: (n_teams,) array}, indexed by position in teams."""
+        idx = {t: i for i, t in enumerate(teams)}
+        games = np.array([(idx[m['home']], idx[m['away']], m['home_goals'], m['away_goals'])
+                          for m in played], dtype=int).reshape(-1, 4)
+        zero = {k: np.zeros(len(teams), dtype=int) for k in RECORD_DTYPE.names if k != 'pos'}
+        # One "simulation" whose games are the played matches
+        return {k: v[0] for k, v in self.season_stats(zero, *(c[None] for c in games.T)).items()}
+
+    def generate_fixtures(self, pair_a, pair_b, n_sims):
+        """Random home/away assignment and match order for team-id pairings; (n_sims, n_games) arrays."""
+        flip = self.rng.random((n_sims, len(pair_a))) < 0.5
+        order = self.rng.permuted(np.tile(np.arange(len(pair_a)), (n_sims, 1)), axis=1)
+        home, away = np.where(flip, pair_a, pair_b), np.where(flip, pair_b, pair_a)
+        return np.take_along_axis(home, order, axis=1), np.take_along_axis(away, order, axis=1)
+
+    def season_stats(self, base, home, away, hg, ag):
+        """Per-team totals, (n_sims, n_teams) arrays indexed by team id, after adding results to base."""
+        n_sims, n = len(home), len(base['pts'])
+        offset = n * np.arange(n_sims)[:, None]  # each sim's teams get their own bincount slots
+        h_ids, a_ids = (home + offset).ravel(), (away + offset).ravel()
+        win, draw, loss = (hg > ag).astype(int), (hg == ag).astype(int), (hg < ag).astype(int)
+        ones = np.ones_like(home)
+        def per_team(h_vals, a_vals):
+            return (np.bincount(h_ids, h_vals.ravel(), n_sims * n)
+                    + np.bincount(a_ids, a_vals.ravel(), n_sims * n)).reshape(n_sims, n)
+        s = {'pts': per_team(3*win + draw, 3*loss + draw), 'gd': per_team(hg - ag, ag - hg),
+             'gf': per_team(hg, ag), 'ga': per_team(ag, hg), 'gp': per_team(ones, ones),
+             'w': per_team(win, loss), 'd': per_team(draw, draw), 'l': per_team(loss, win)}
+        return {k: base[k] + v.astype(int) for k, v in s.items()}
+
+    def _simulate_seasons(self, teams, played, n_sims):
+        """Play every remaining fixture n_sims times and rank each simulated season.
+
+        Returns the (n_sims, n_teams) records array, the base standings arrays and
+        the games as (home, away, home_goals, away_goals) arrays of shape (n_sims, n_games).
+        """
+        pair_a, pair_b = remaining_pairings(teams, played)
+        xg_home, xg_away = self.elo.expected_goals_matrix(teams)
+        base = self.build_standings(teams, played)
+        home, away = self.generate_fixtures(pair_a, pair_b, n_sims)
+        hg = np.minimum(self.rng.poisson(xg_home[home, away]), 8)
+        ag = np.minimum(self.rng.poisson(xg_away[home, away]), 8)
+        records = np.zeros((n_sims, len(teams)), dtype=RECORD_DTYPE)
+        self._record_tables(records, self.season_stats(base, home, away, hg, ag))
+        return records, base, (home, away, hg, ag)
+
+    def _record_tables(self, records, s):
+        """Rank every simulated season into its row of the (n_sims, n_teams) records array."""
+        tables = np.lexsort((-s['gf'], -s['gd'], -s['pts']), axis=-1)
+        np.put_along_axis(records['pos'], tables, np.arange(1, tables.shape[1] + 1), axis=1)
+        for k, v in s.items(): records[k] = v
+
+    def _by_team(self, teams, records):
+        """Teams ordered by average finishing position, and each team's column of records."""
+        order = np.argsort(records['pos'].sum(axis=0), kind='stable')
+        return [teams[i] for i in order], {t: records[:, i] for i, t in enumerate(teams)}
+
+    def summary_columns(self, sorted_teams, sim_records):
+        """Summary-table columns in sorted_teams order, each reduced over every simulation at once."""
+        recs = np.stack([sim_records[t] for t in sorted_teams], axis=1)
+        pts, pos = recs['pts'], recs['pos']
+        return {'avg_pts': pts.mean(axis=0), 'min_pts': pts.min(axis=0), 'max_pts': pts.max(axis=0),
+                'avg_gd': recs['gd'].mean(axis=0), 'avg_gf': recs['gf'].mean(axis=0),
+                'avg_ga': recs['ga'].mean(axis=0), 'champ': (pos == 1).mean(axis=0),
+                'prom': (pos <= 2).mean(axis=0), 'rel': (pos >= len(sorted_teams) - 1).mean(axis=0)}
 
     def run_simulation(self, league_code, n_sims=1000):
         teams, matches = self.get_league_data(2025, league_code)
         played = [m for m in matches if m['date'] < self.cutoff]
-        base = self.build_standings(teams, played)
-        n_teams = len(teams)
-        if n_teams < 4: return None
-
-        sim_records = {t: [] for t in teams}
-        all_game_logs = []
-
-        for _ in range(n_sims):
-            s = {t: dict(base[t]) for t in teams}
-            fixtures = self.generate_fixtures(teams, played)
-            game_log = []
-            for h, a in fixtures:
-                hg, ag = self.sim_match(h, a)
-                s[h]['gp'] += 1; s[a]['gp'] += 1
-                s[h]['gf'] += hg; s[h]['ga'] += ag; s[a]['gf'] += ag; s[a]['ga'] += hg
-                gd = hg - ag; s[h]['gd'] += gd; s[a]['gd'] -= gd
-                if hg > ag: s[h]['pts'] += 3; s[h]['w'] += 1; s[a]['l'] += 1
-                elif ag > hg: s[a]['pts'] += 3; s[a]['w'] += 1; s[h]['l'] += 1
-                else: s[h]['pts'] += 1; s[a]['pts'] += 1; s[h]['d'] += 1; s[a]['d'] += 1
-                game_log.append((h, a, hg, ag))
-
-            table = sorted(teams, key=lambda t: (-s[t]['pts'], -s[t]['gd'], -s[t]['gf']))
-            for pos, t in enumerate(table, 1):
-                sim_records[t].append({'pos': pos, 'pts': s[t]['pts'], 'gd': s[t]['gd'],
-                    'gf': s[t]['gf'], 'ga': s[t]['ga'], 'gp': s[t]['gp'],
-                    'w': s[t]['w'], 'd': s[t]['d'], 'l': s[t]['l']})
-            all_game_logs.append(game_log)
-
-        avg_pos = {t: np.mean([r['pos'] for r in sim_records[t]]) for t in teams}
-        sorted_teams = sorted(teams, key=lambda t: avg_pos[t])
-
-        self.last_results = sorted_teams; self.last_sim_records = sim_records
-        self.last_game_logs = all_game_logs; self.last_n_sims = n_sims
-        self.last_league = league_code; self.last_teams = teams
-        return sorted_teams, sim_records, base, n_sims, teams
+        if len(teams) < 4: return None
+        teams = sorted(teams)
+        # All seasons at once: one row per simulation
+        records, base, games = self._simulate_seasons(teams, played, n_sims)
+        sorted_teams, sim_records = self._by_team(teams, records)
+        # A single assignment, so other threads see either the old run or the new one
+        self.last_run = SimRun(league_code, n_sims, teams, sorted_teams, sim_records, base, games)
+        return self.last_run
+
+    def latest_simulation(self, league_code, n_sims):
+        """run_simulation, reusing the previous run when it was for the same league and size."""
+        run = self.last_run
+        if run is not None and run.league == league_code and run.n_sims == n_sims:
+            return run
+        return self.run_simulation(league_code, n_sims)
 
     def get_historic_teams(self, year, league_code):
         """Get all teams that played in a given league in a given year."""
-        teams = set()
-        for m in self.all_matches:
-            if m['date'].year == year:
-                lg = self.team_league_map.get((m['home'], year))
-                if lg == league_code:
-                    teams.add(m['home']); teams.add(m['away'])
+        teams, _ = self.get_league_data(year, league_code)
         return sorted(teams)
 
     def get_all_historic_teams(self):
         """Get all unique team names ever."""
         return sorted(set(m['home'] for m in self.all_matches) | set(m['away'] for m in self.all_matches))
 
+    def get_first_seasons(self):
+        """First season (2022-2025) each team appears in a league, in a single pass."""
+        first = {}
+        for (year, league), matches in self.season_matches.items():
+            if league not in ('PL', 'ESL', 'ESB') or not 2022 <= year <= 2025: continue
+            for m in matches:
+                for t in (m['home'], m['away']):
+                    if year < first.get(t, 9999): first[t] = year
+        return first
+
     def replay_season(self, year, league_code, n_sims=1000):
         """Replay a full historic season from scratch."""
         teams = self.get_historic_teams(year, league_code)
         if len(teams) < 4: return None
-
-        sim_records = {t: [] for t in teams}
-        for _ in range(n_sims):
-            s = {t: {'pts': 0, 'gd': 0, 'gf': 0, 'ga': 0, 'gp': 0, 'w': 0, 'd': 0, 'l': 0} for t in teams}
-            fixtures = self.generate_fixtures(teams, [])
-            for h, a in fixtures:
-                hg, ag = self.sim_match(h, a)
-                s[h]['gp'] += 1; s[a]['gp'] += 1
-                s[h]['gf'] += hg; s[h]['ga'] += ag; s[a]['gf'] += ag; s[a]['ga'] += hg
-                gd = hg - ag; s[h]['gd'] += gd; s[a]['gd'] -= gd
-                if hg > ag: s[h]['pts'] += 3; s[h]['w'] += 1; s[a]['l'] += 1
-                elif ag > hg: s[a]['pts'] += 3; s[a]['w'] += 1; s[h]['l'] += 1
-                else: s[h]['pts'] += 1; s[a]['pts'] += 1; s[h]['d'] += 1; s[a]['d'] += 1
-
-            table = sorted(teams, key=lambda t: (-s[t]['pts'], -s[t]['gd'], -s[t]['gf']))
-            for pos, t in enumerate(table, 1):
-                sim_records[t].append({'pos': pos, 'pts': s[t]['pts'], 'gd': s[t]['gd'],
-                    'gf': s[t]['gf'], 'ga': s[t]['ga'], 'gp': s[t]['gp'],
-                    'w': s[t]['w'], 'd': s[t]['d'], 'l': s[t]['l']})
-
-        avg_pos = {t: np.mean([r['pos'] for r in sim_records[t]]) for t in teams}
-        self.last_results = sorted(teams, key=lambda t: avg_pos[t])
-        self.last_sim_records = sim_records; self.last_n_sims = n_sims
-        self.last_league = league_code; self.last_teams = teams
-        return self.last_results, sim_records, None, n_sims, teams
+        records = self._simulate_seasons(teams, [], n_sims)[0]
+        sorted_teams, sim_records = self._by_team(teams, records)
+        return sorted_teams, sim_records, None, n_sims, teams
 
     def sim_custom_league(self, teams, n_sims=1000):
         """Simulate a custom league with any set of teams."""
         if len(teams) < 3: return None
-        sim_records = {t: [] for t in teams}
-        for _ in range(n_sims):
-            s = {t: {'pts': 0, 'gd': 0, 'gf': 0, 'ga': 0, 'gp': 0, 'w': 0, 'd': 0, 'l': 0} for t in teams}
-            fixtures = self.generate_fixtures(teams, [])
-            for h, a in fixtures:
-                hg, ag = self.sim_match(h, a)
-                s[h]['gp'] += 1; s[a]['gp'] += 1
-                s[h]['gf'] += hg; s[h]['ga'] += ag; s[a]['gf'] += ag; s[a]['ga'] += hg
-                gd = hg - ag; s[h]['gd'] += gd; s[a]['gd'] -= gd
-                if hg > ag: s[h]['pts'] += 3; s[h]['w'] += 1; s[a]['l'] += 1
-                elif ag > hg: s[a]['pts'] += 3; s[a]['w'] += 1; s[h]['l'] += 1
-                else: s[h]['pts'] += 1; s[a]['pts'] += 1; s[h]['d'] += 1; s[a]['d'] += 1
-
-            table = sorted(teams, key=lambda t: (-s[t]['pts'], -s[t]['gd'], -s[t]['gf']))
-            for pos, t in enumerate(table, 1):
-                sim_records[t].append({'pos': pos, 'pts': s[t]['pts'], 'gd': s[t]['gd'],
-                    'gf': s[t]['gf'], 'ga': s[t]['ga'], 'gp': s[t]['gp'],
-                    'w': s[t]['w'], 'd': s[t]['d'], 'l': s[t]['l']})
-
-        return sim_records, n_sims
+        records = self._simulate_seasons(teams, [], n_sims)[0]
+        sorted_teams, sim_records = self._by_team(teams, records)
+        return sorted_teams, sim_records, n_sims
 
 
 class SimulatorUI:
@@ -189,6 +230,13 @@ class SimulatorUI:
         self.root.title("Estonian Football League Simulator")
         self.root.geometry("1300x900")
         self.root.configure(bg='#1a1a2e')
+        # Worker threads post results here and wake the Tk loop with <<SimDone>>;
+        # one producer, one consumer, so deque's atomic append/popleft is enough
+        self.sim_queue = deque()
+        self.root.bind('<<SimDone>>', self._drain_sim_queue)
+        # One simulation in flight at a time; its buttons stay disabled until it finishes
+        self.running = False; self.run_buttons = []
+        self.season_run = None  # SimRun behind the Season Browser
         self._apply_theme()
         self._build()
         self.root.mainloop()
@@ -231,7 +279,8 @@ class SimulatorUI:
         ttk.Label(ctrl, text="Simulations:").pack(side=tk.LEFT, padx=5)
         self.sim_count = tk.StringVar(value="1000")
         ttk.Combobox(ctrl, textvariable=self.sim_count, values=["100","500","1000","2000","5000","10000"], width=7).pack(side=tk.LEFT, padx=5)
-        ttk.Button(ctrl, text="Run All Leagues", style='Accent.TButton', command=self._run_league).pack(side=tk.LEFT, padx=15)
+        btn = ttk.Button(ctrl, text="Run All Leagues", style='Accent.TButton', command=self._run_league)
+        btn.pack(side=tk.LEFT, padx=15); self.run_buttons.append(btn)
         self.league_status = ttk.Label(ctrl, text=""); self.league_status.pack(side=tk.LEFT, padx=10)
 
         self.league_notebook = ttk.Notebook(parent)
@@ -249,7 +298,8 @@ class SimulatorUI:
         ttk.Label(ctrl, text="Sims:").pack(side=tk.LEFT, padx=(20,5))
         self.team_sim_count = tk.StringVar(value="1000")
         ttk.Combobox(ctrl, textvariable=self.team_sim_count, values=["500","1000","2000","5000"], width=7).pack(side=tk.LEFT, padx=5)
-        ttk.Button(ctrl, text="Analyze", style='Accent.TButton', command=self._team_analysis).pack(side=tk.LEFT, padx=15)
+        btn = ttk.Button(ctrl, text="Analyze", style='Accent.TButton', command=self._team_analysis)
+        btn.pack(side=tk.LEFT, padx=15); self.run_buttons.append(btn)
         self.team_status = ttk.Label(ctrl, text=""); self.team_status.pack(side=tk.LEFT, padx=10)
         self.team_output = tk.Text(parent, bg='#16213e', fg='#e0e0e0', insertbackground='white',
                                     font=('Consolas', 10), relief='flat', padx=10, pady=10)
@@ -282,7 +332,8 @@ class SimulatorUI:
         ttk.Label(ctrl, text="Sims:").pack(side=tk.LEFT, padx=(20,5))
         self.season_sim_count = tk.StringVar(value="1000")
         ttk.Combobox(ctrl, textvariable=self.season_sim_count, values=["100","500","1000","2000","5000"], width=7).pack(side=tk.LEFT, padx=5)
-        ttk.Button(ctrl, text="Run", style='Accent.TButton', command=self._run_season_sim).pack(side=tk.LEFT, padx=10)
+        btn = ttk.Button(ctrl, text="Run", style='Accent.TButton', command=self._run_season_sim)
+        btn.pack(side=tk.LEFT, padx=10); self.run_buttons.append(btn)
         ttk.Label(ctrl, text="  Season #:").pack(side=tk.LEFT, padx=(20,5))
         self.season_num = tk.StringVar(value="1")
         ttk.Entry(ctrl, textvariable=self.season_num, width=6).pack(side=tk.LEFT, padx=5)
@@ -300,56 +351,91 @@ class SimulatorUI:
     def _run_league(self):
         try: n = int(self.sim_count.get())
         except: n = 1000
-        self.league_status.config(text="Simulating..."); self.root.update()
-
-        for lg_code, lg_name in [('PL','Premium Liiga'),('ESL','Esiliiga'),('ESB','Esiliiga B')]:
-            result = self.sim.run_simulation(lg_code, n)
-            if not result: continue
-            sorted_teams, sim_records, base, n_sims, teams = result
-            n_teams = len(teams)
-
-            tab_idx = {'PL':0,'ESL':1,'ESB':2}[lg_code]
-            tab = self.league_notebook.winfo_children()[tab_idx]
-            for w in tab.winfo_children(): w.destroy()
-
-            tree = ttk.Treeview(tab, columns=('pos','team','pts','pt_range','gd','gf','ga','champ','prom','rel'),
-                                show='headings', height=12)
-            tree.heading('pos', text='#'); tree.column('pos', width=30, anchor='center')
-            tree.heading('team', text='Team'); tree.column('team', width=240)
-            tree.heading('pts', text='AvgPts'); tree.column('pts', width=65, anchor='center')
-            tree.heading('pt_range', text='Pts Range'); tree.column('pt_range', width=100, anchor='center')
-            tree.heading('gd', text='AvgGD'); tree.column('gd', width=60, anchor='center')
-            tree.heading('gf', text='GF/g'); tree.column('gf', width=55, anchor='center')
-            tree.heading('ga', text='GA/g'); tree.column('ga', width=55, anchor='center')
-            tree.heading('champ', text='Champ'); tree.column('champ', width=65, anchor='center')
-            tree.heading('prom', text='Prom'); tree.column('prom', width=60, anchor='center')
-            tree.heading('rel', text='Releg'); tree.column('rel', width=60, anchor='center')
-            tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-
-            for rank, t in enumerate(sorted_teams, 1):
-                recs = sim_records[t]
-                avg_pts = np.mean([r['pts'] for r in recs])
-                mn, mx = np.min([r['pts'] for r in recs]), np.max([r['pts'] for r in recs])
-                avg_gd = np.mean([r['gd'] for r in recs])
-                avg_gf = np.mean([r['gf'] for r in recs]); avg_ga = np.mean([r['ga'] for r in recs])
-                c = sum(1 for r in recs if r['pos']==1)/n_sims
-                p = sum(1 for r in recs if r['pos']<=2)/n_sims
-                rl = sum(1 for r in recs if r['pos']>=n_teams-1)/n_sims
-                tags = ""
-                if c>0.3: tags=" C"
-                elif p>0.3: tags=" P"
-                if rl>0.5: tags=" R"
-                tree.insert('', 'end', values=(rank, f"{t} {tags}", f"{avg_pts:.1f}",
-                    f"{mn:.0f} - {mx:.0f}", f"{avg_gd:+.1f}", f"{avg_gf:.1f}", f"{avg_ga:.1f}",
-                    f"{c:.1%}", f"{p:.1%}", f"{rl:.1%}"))
-
-            rules = { 'PL': '10th auto-relegated | 9th playoff vs Esiliiga 2nd',
-                      'ESL': '1st auto-promoted, 2nd playoff vs PL 9th | 9-10th relegated, 8th playoff vs ESB 3rd',
-                      'ESB': '1st-2nd auto-promoted, 3rd playoff vs Esiliiga 8th' }[lg_code]
-            summary = ttk.Label(tab, text=f"{lg_name}: {n_sims:,} simulations | {rules} | C=Champ P=Prom R=Releg")
-            summary.pack(pady=3)
-
-        self.league_status.config(text=f"Done. {n:,} sims per league")
+        if not self._start_run(): return
+        self.league_status.config(text="Simulating...")
+        threading.Thread(target=self._league_worker, args=(n,), daemon=True).start()
+
+    def _league_worker(self, n):
+        """Runs off the Tk thread; each league's table is shown as soon as it is ready."""
+        try:
+            for lg_code, lg_name in [('PL','Premium Liiga'),('ESL','Esiliiga'),('ESB','Esiliiga B')]:
+                result = self.sim.run_simulation(lg_code, n)
+                if result: self._post(self._show_league, lg_code, lg_name, result)
+            self._post(lambda: self.league_status.config(text=f"Done. {n:,} sims per league"))
+        finally:
+            self._post(self._end_run)
+
+    def _start_run(self):
+        """Claim the single simulation slot (Tk thread only); False if a run is already in flight."""
+        if self.running: return False
+        self.running = True
+        for b in self.run_buttons: b.state(['disabled'])
+        return True
+
+    def _end_run(self):
+        self.running = False
+        for b in self.run_buttons: b.state(['!disabled'])
+
+    def _run_in_background(self, work, done, *args):
+        """Run work() off the Tk thread, then done(*args, result) back on it.
+
+        The caller has claimed the run slot with _start_run; it is released once work is over.
+        """
+        def worker():
+            try: self._post(done, *args, work())
+            finally: self._post(self._end_run)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _post(self, fn, *args):
+        """Queue fn(*args) to run on the Tk thread; safe to call from worker threads."""
+        self.sim_queue.append((fn, args))
+        self.root.event_generate('<<SimDone>>', when='tail')
+
+    def _drain_sim_queue(self, event=None):
+        while True:
+            try: fn, args = self.sim_queue.popleft()
+            except IndexError: return
+            fn(*args)
+
+    def _show_league(self, lg_code, lg_name, result):
+        sorted_teams, sim_records, n_sims = result.sorted_teams, result.sim_records, result.n_sims
+
+        tab_idx = {'PL':0,'ESL':1,'ESB':2}[lg_code]
+        tab = self.league_notebook.winfo_children()[tab_idx]
+        for w in tab.winfo_children(): w.destroy()
+
+        tree = ttk.Treeview(tab, columns=('pos','team','pts','pt_range','gd','gf','ga','champ','prom','rel'),
+                            show='headings', height=12)
+        tree.heading('pos', text='#'); tree.column('pos', width=30, anchor='center')
+        tree.heading('team', text='Team'); tree.column('team', width=240)
+        tree.heading('pts', text='AvgPts'); tree.column('pts', width=65, anchor='center')
+        tree.heading('pt_range', text='Pts Range'); tree.column('pt_range', width=100, anchor='center')
+        tree.heading('gd', text='AvgGD'); tree.column('gd', width=60, anchor='center')
+        tree.heading('gf', text='GF/g'); tree.column('gf', width=55, anchor='center')
+        tree.heading('ga', text='GA/g'); tree.column('ga', width=55, anchor='center')
+        tree.heading('champ', text='Champ'); tree.column('champ', width=65, anchor='center')
+        tree.heading('prom', text='Prom'); tree.column('prom', width=60, anchor='center')
+        tree.heading('rel', text='Releg'); tree.column('rel', width=60, anchor='center')
+
+        cols = self.sim.summary_columns(sorted_teams, sim_records)
+        for i, t in enumerate(sorted_teams):
+            c, p, rl = cols['champ'][i], cols['prom'][i], cols['rel'][i]
+            tags = ""
+            if c>0.3: tags=" C"
+            elif p>0.3: tags=" P"
+            if rl>0.5: tags=" R"
+            tree.insert('', 'end', values=(i + 1, f"{t} {tags}", f"{cols['avg_pts'][i]:.1f}",
+                f"{cols['min_pts'][i]:.0f} - {cols['max_pts'][i]:.0f}", f"{cols['avg_gd'][i]:+.1f}",
+                f"{cols['avg_gf'][i]:.1f}", f"{cols['avg_ga'][i]:.1f}",
+                f"{c:.1%}", f"{p:.1%}", f"{rl:.1%}"))
+        # Fill the tree before mapping it, so Tk lays it out once
+        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        rules = { 'PL': '10th auto-relegated | 9th playoff vs Esiliiga 2nd',
+                  'ESL': '1st auto-promoted, 2nd playoff vs PL 9th | 9-10th relegated, 8th playoff vs ESB 3rd',
+                  'ESB': '1st-2nd auto-promoted, 3rd playoff vs Esiliiga 8th' }[lg_code]
+        summary = ttk.Label(tab, text=f"{lg_name}: {n_sims:,} simulations | {rules} | C=Champ P=Prom R=Releg")
+        summary.pack(pady=3)
 
     # ─── TEAM DEEP ANALYSIS ───
     def _team_analysis(self):
@@ -357,81 +443,71 @@ class SimulatorUI:
         if not team: return
         try: n = int(self.team_sim_count.get())
         except: n = 1000
-        self.team_status.config(text=f"Analyzing {team}..."); self.root.update()
+        if not self._start_run(): return
+        self.team_status.config(text=f"Analyzing {team}...")
 
         team_lg = self.sim.team_league_map.get((team,2025)) or self.sim.team_league_map.get((team,2024)) or 'ESL'
-        result = self.sim.run_simulation(team_lg, n)
+        self._run_in_background(lambda: self.sim.latest_simulation(team_lg, n), self._show_team_analysis, team, team_lg)
+
+    def _show_team_analysis(self, team, team_lg, result):
         if not result: return
-        _, sim_records, _, n_sims, teams = result
+        sorted_teams, sim_records, n_sims, teams = result.sorted_teams, result.sim_records, result.n_sims, result.teams
         recs = sim_records[team]; out = self.team_output
         out.delete(1.0, tk.END)
+        rows = []
 
         elo_val = self.sim.elo.ratings.get(team, 1500)
-        pts = [r['pts'] for r in recs]; pos = [r['pos'] for r in recs]
-        gd = [r['gd'] for r in recs]; gf = [r['gf'] for r in recs]; ga = [r['ga'] for r in recs]
-        wins = [r['w'] for r in recs]; draws = [r['d'] for r in recs]; losses = [r['l'] for r in recs]
-        lpos = sorted(teams, key=lambda t: np.mean([rr['pos'] for rr in sim_records[t]])).index(team)+1
-        best = max(recs, key=lambda r: r['pts']); worst = min(recs, key=lambda r: r['pts'])
-
-        out.insert(tk.END, f"\n  DEEP ANALYSIS: {team} ({team_lg})\n")
-        out.insert(tk.END, f"  {'='*70}\n\n")
-        out.insert(tk.END, f"  ELO: {elo_val:.0f}  |  Expected finish: {lpos}/{len(teams)}\n")
-        out.insert(tk.END, f"  Projected: {np.mean(pts):.1f} pts | GD {np.mean(gd):+.1f} | GF/g {np.mean(gf):.1f} | GA/g {np.mean(ga):.1f}\n\n")
-        out.insert(tk.END, f"  BEST SEASON:  {best['pos']}. place, {best['pts']} pts, W{best['w']}-D{best['d']}-L{best['l']}, GD {best['gd']:+d}, GF {best['gf']}\n")
-        out.insert(tk.END, f"  WORST SEASON: {worst['pos']}. place, {worst['pts']} pts, W{worst['w']}-D{worst['d']}-L{worst['l']}, GD {worst['gd']:+d}, GF {worst['gf']}\n")
-        out.insert(tk.END, f"  RECORDS: Wins {np.min(wins)}-{np.max(wins)} (avg {np.mean(wins):.1f}) | Draws {np.min(draws)}-{np.max(draws)} (avg {np.mean(draws):.1f}) | Losses {np.min(losses)}-{np.max(losses)} (avg {np.mean(losses):.1f})\n")
-
-        out.insert(tk.END, f"\n  POSITION DISTRIBUTION:\n")
-        pc = defaultdict(int)
-        for p in pos: pc[p] += 1
-        mx = max(pc.values())
-        for p in sorted(pc.keys()):
+        pts = recs['pts']; pos = recs['pos']; gd = recs['gd']; gf = recs['gf']; ga = recs['ga']
+        wins = recs['w']; draws = recs['d']; losses = recs['l']
+        lpos = sorted_teams.index(team)+1
+        best = recs[pts.argmax()]; worst = recs[pts.argmin()]
+
+        rows.append(f"\n  DEEP ANALYSIS: {team} ({team_lg})\n")
+        rows.append(f"  {'='*70}\n\n")
+        rows.append(f"  ELO: {elo_val:.0f}  |  Expected finish: {lpos}/{len(teams)}\n")
+        rows.append(f"  Projected: {np.mean(pts):.1f} pts | GD {np.mean(gd):+.1f} | GF/g {np.mean(gf):.1f} | GA/g {np.mean(ga):.1f}\n\n")
+        rows.append(f"  BEST SEASON:  {best['pos']}. place, {best['pts']} pts, W{best['w']}-D{best['d']}-L{best['l']}, GD {best['gd']:+d}, GF {best['gf']}\n")
+        rows.append(f"  WORST SEASON: {worst['pos']}. place, {worst['pts']} pts, W{worst['w']}-D{worst['d']}-L{worst['l']}, GD {worst['gd']:+d}, GF {worst['gf']}\n")
+        rows.append(f"  RECORDS: Wins {np.min(wins)}-{np.max(wins)} (avg {np.mean(wins):.1f}) | Draws {np.min(draws)}-{np.max(draws)} (avg {np.mean(draws):.1f}) | Losses {np.min(losses)}-{np.max(losses)} (avg {np.mean(losses):.1f})\n")
+
+        rows.append(f"\n  POSITION DISTRIBUTION:\n")
+        pc = np.bincount(pos)
+        mx = pc.max()
+        for p in np.flatnonzero(pc):
             bar = "|" * int(50 * pc[p] / mx)
-            out.insert(tk.END, f"    {p:2d}: {bar:<50} {pc[p]/n_sims:.1%} ({pc[p]})\n")
-
-        out.insert(tk.END, f"\n  POINTS DISTRIBUTION:\n")
-        pb = defaultdict(int)
-        for p in pts: pb[int(p)//4*4] += 1
-        mx = max(pb.values())
-        for b in sorted(pb.keys()):
-            bar = "|" * int(40 * pb[b] / mx)
-            out.insert(tk.END, f"    {b:3d}-{b+3:3d}: {bar:<40} {pb[b]/n_sims:.1%}\n")
-
-        # Game-based stats
-        if self.sim.last_game_logs and self.sim.last_league == team_lg:
-            all_logs = self.sim.last_game_logs
-            big_wins = []; big_losses = []
-            opp_stats = defaultdict(lambda: {'gf': 0, 'ga': 0, 'g': 0})
-            total_gf = total_ga = total_g = 0
-
-            for si, logs in enumerate(all_logs):
-                for h, a, hg, ag in logs:
-                    if h == team:
-                        total_gf += hg; total_ga += ag; total_g += 1
-                        opp_stats[a]['gf'] += hg; opp_stats[a]['ga'] += ag; opp_stats[a]['g'] += 1
-                        if hg > ag: big_wins.append((hg-ag, a, f"{hg}-{ag}", si+1))
-                        elif ag > hg: big_losses.append((ag-hg, a, f"{hg}-{ag}", si+1))
-                    elif a == team:
-                        total_gf += ag; total_ga += hg; total_g += 1
-                        opp_stats[h]['gf'] += ag; opp_stats[h]['ga'] += hg; opp_stats[h]['g'] += 1
-                        if ag > hg: big_wins.append((ag-hg, h, f"{ag}-{hg}", si+1))
-                        elif hg > ag: big_losses.append((hg-ag, h, f"{hg}-{ag}", si+1))
-
-            big_wins.sort(key=lambda x: -x[0]); big_losses.sort(key=lambda x: -x[0])
-
-            out.insert(tk.END, f"\n  SIMULATED GAMES: {total_g:,} total | {total_gf/max(1,total_g):.2f} GF/g | {total_ga/max(1,total_g):.2f} GA/g\n")
-            out.insert(tk.END, f"\n  BIGGEST WINS:\n")
-            for margin, opp, score, sn in big_wins[:5]:
-                out.insert(tk.END, f"    +{margin}  {score}  vs  {opp}  (season {sn})\n")
-            out.insert(tk.END, f"\n  BIGGEST LOSSES:\n")
-            for margin, opp, score, sn in big_losses[:5]:
-                out.insert(tk.END, f"    -{margin}  {score}  vs  {opp}  (season {sn})\n")
-
-            out.insert(tk.END, f"\n  PER-OPPONENT:\n")
-            sorted_opp = sorted(opp_stats.items(), key=lambda x: -(x[1]['gf']/x[1]['g'] - x[1]['ga']/x[1]['g']))
-            for opp, s in sorted_opp:
-                g = s['g']; out.insert(tk.END, f"    vs {opp[:28]:<29} {s['gf']/g:.1f} GF  {s['ga']/g:.1f} GA  ({g} games)\n")
-
+            rows.append(f"    {p:2d}: {bar:<50} {pc[p]/n_sims:.1%} ({pc[p]})\n")
+
+        rows.append(f"\n  POINTS DISTRIBUTION:\n")
+        pb = np.bincount(pts // 4)  # 4-point buckets
+        mx = pb.max()
+        for i in np.flatnonzero(pb):
+            b = 4 * i; bar = "|" * int(40 * pb[i] / mx)
+            rows.append(f"    {b:3d}-{b+3:3d}: {bar:<40} {pb[i]/n_sims:.1%}\n")
+
+        # Game-based stats, from the same run as the tables above
+        _, opp_ids, _, gf_g, ga_g = result.team_results(team)
+        total_g = len(opp_ids); total_gf = int(gf_g.sum()); total_ga = int(ga_g.sum())
+        opp_g = np.bincount(opp_ids, minlength=len(teams))
+        opp_gf = np.bincount(opp_ids, gf_g, len(teams)); opp_ga = np.bincount(opp_ids, ga_g, len(teams))
+
+        big_wins, big_losses = result.extreme_results(team, 5)
+
+        rows.append(f"\n  SIMULATED GAMES: {total_g:,} total | {total_gf/max(1,total_g):.2f} GF/g | {total_ga/max(1,total_g):.2f} GA/g\n")
+        rows.append(f"\n  BIGGEST WINS:\n")
+        for margin, opp, score, sn in big_wins[:5]:
+            rows.append(f"    +{margin}  {score}  vs  {opp}  (season {sn})\n")
+        rows.append(f"\n  BIGGEST LOSSES:\n")
+        for margin, opp, score, sn in big_losses[:5]:
+            rows.append(f"    -{margin}  {score}  vs  {opp}  (season {sn})\n")
+
+        rows.append(f"\n  PER-OPPONENT:\n")
+        ids, first = np.unique(opp_ids, return_index=True)
+        ids = ids[np.argsort(first)]  # ties keep first-met order
+        ids = ids[np.argsort(-(opp_gf[ids] / opp_g[ids] - opp_ga[ids] / opp_g[ids]), kind='stable')]
+        for o in ids:
+            g = opp_g[o]; rows.append(f"    vs {teams[o][:28]:<29} {opp_gf[o]/g:.1f} GF  {opp_ga[o]/g:.1f} GA  ({g} games)\n")
+
+        out.insert(tk.END, ''.join(rows))
         self.team_status.config(text=f"Done - {team} analyzed over {n_sims:,} seasons")
 
     # ─── MATCH PREDICTION ───
@@ -441,113 +517,111 @@ class SimulatorUI:
         try: n = int(self.match_sims.get())
         except: n = 5000
         out = self.match_output; out.delete(1.0, tk.END)
+        rows = []
         h_elo = self.sim.elo.ratings.get(h, 1500); a_elo = self.sim.elo.ratings.get(a, 1500)
         hg_xg, ag_xg = self.sim.elo.expected_goals(h, a)
 
-        results = {'H':0,'D':0,'A':0}; scorelines = defaultdict(int); gh=ga=0
-        for _ in range(n):
-            hg, ag = self.sim.sim_match(h, a)
-            if hg>ag: results['H']+=1
-            elif ag>hg: results['A']+=1
-            else: results['D']+=1
-            scorelines[(hg,ag)]+=1; gh+=hg; ga+=ag
-
-        out.insert(tk.END, f"\n  {h} vs {a}\n")
-        out.insert(tk.END, f"  {'='*60}\n\n")
-        out.insert(tk.END, f"  ELO: {h_elo:.0f}  vs  {a_elo:.0f}  (diff: {h_elo-a_elo:+.0f})\n")
-        out.insert(tk.END, f"  Expected goals: {hg_xg:.2f} - {ag_xg:.2f}\n\n")
-        out.insert(tk.END, f"  {n:,} SIMULATIONS:\n")
-        out.insert(tk.END, f"    {h} win:  {results['H']/n:.1%}  ({results['H']:,})\n")
-        out.insert(tk.END, f"    Draw:       {results['D']/n:.1%}  ({results['D']:,})\n")
-        out.insert(tk.END, f"    {a} win:  {results['A']/n:.1%}  ({results['A']:,})\n\n")
-        out.insert(tk.END, f"  Average goals: {gh/n:.2f} - {ga/n:.2f}  (total {gh/n+ga/n:.2f})\n\n")
-        out.insert(tk.END, f"  Most common scorelines:\n")
+        hg, ag = self.sim.sim_matches(h, a, n)
+        results = {'H': int((hg>ag).sum()), 'D': int((hg==ag).sum()), 'A': int((hg<ag).sum())}
+        gh, ga = int(hg.sum()), int(ag.sum())
+        lines, counts = np.unique(np.column_stack((hg, ag)), axis=0, return_counts=True)
+        scorelines = {(int(x), int(y)): int(c) for (x, y), c in zip(lines, counts)}
+
+        rows.append(f"\n  {h} vs {a}\n")
+        rows.append(f"  {'='*60}\n\n")
+        rows.append(f"  ELO: {h_elo:.0f}  vs  {a_elo:.0f}  (diff: {h_elo-a_elo:+.0f})\n")
+        rows.append(f"  Expected goals: {hg_xg:.2f} - {ag_xg:.2f}\n\n")
+        rows.append(f"  {n:,} SIMULATIONS:\n")
+        rows.append(f"    {h} win:  {results['H']/n:.1%}  ({results['H']:,})\n")
+        rows.append(f"    Draw:       {results['D']/n:.1%}  ({results['D']:,})\n")
+        rows.append(f"    {a} win:  {results['A']/n:.1%}  ({results['A']:,})\n\n")
+        rows.append(f"  Average goals: {gh/n:.2f} - {ga/n:.2f}  (total {gh/n+ga/n:.2f})\n\n")
+        rows.append(f"  Most common scorelines:\n")
         for (hg,ag), cnt in sorted(scorelines.items(), key=lambda x:-x[1])[:12]:
-            out.insert(tk.END, f"    {hg}-{ag}  {cnt:6d}  ({cnt/n:.1%})\n")
+            rows.append(f"    {hg}-{ag}  {cnt:6d}  ({cnt/n:.1%})\n")
+        out.insert(tk.END, ''.join(rows))
 
     # ─── SEASON BROWSER ───
     def _run_season_sim(self):
         lg = self.season_lg.get()
         try: n = int(self.season_sim_count.get())
         except: n = 1000
-        self.season_status.config(text="Running..."); self.root.update()
-        self.sim.run_simulation(lg, n)
+        if not self._start_run(): return
+        self.season_status.config(text="Running...")
+        self._run_in_background(lambda: self.sim.run_simulation(lg, n), self._season_sim_done, lg, n)
+
+    def _season_sim_done(self, lg, n, result):
+        self.season_run = result  # the run View Season and Extremes browse
         self.season_status.config(text=f"Saved {n:,} seasons for {lg}. Browse below.")
 
     def _view_season(self):
-        if self.sim.last_game_logs is None:
+        run = self.season_run
+        if run is None:
             self.season_status.config(text="Run a simulation first!"); return
         try: sn = int(self.season_num.get()) - 1
         except: sn = 0
         team = self.season_team.get()
-        if sn < 0 or sn >= len(self.sim.last_game_logs):
+        n_sims = run.n_sims
+        if sn < 0 or sn >= n_sims:
             self.season_status.config(text=f"Season {sn+1} out of range"); return
 
         out = self.season_output; out.delete(1.0, tk.END)
-        logs = self.sim.last_game_logs[sn]; n_sims = len(self.sim.last_game_logs)
-
-        team_games = [(h,a,hg,ag) for h,a,hg,ag in logs if h==team or a==team]
-        w=d=l=0; gf=ga=0
-        for h,a,hg,ag in team_games:
-            if team==h:
-                gf+=hg; ga+=ag
-                if hg>ag: w+=1
-                elif hg<ag: l+=1
-                else: d+=1
-            else:
-                gf+=ag; ga+=hg
-                if ag>hg: w+=1
-                elif ag<hg: l+=1
-                else: d+=1
+        rows = []
+
+        sim, opp, at_home, gf_g, ga_g = run.team_results(team)
+        this = sim == sn
+        opp, at_home, gf_g, ga_g = opp[this], at_home[this], gf_g[this], ga_g[this]
+        opp_names = [run.teams[o] for o in opp]
+        w, d, l = int((gf_g > ga_g).sum()), int((gf_g == ga_g).sum()), int((gf_g < ga_g).sum())
+        gf, ga = int(gf_g.sum()), int(ga_g.sum())
+        n_games = len(opp)
         pts = w*3+d
 
-        out.insert(tk.END, f"\n  SEASON #{sn+1}: {team}\n")
-        out.insert(tk.END, f"  {'='*55}\n")
-        out.insert(tk.END, f"  Record: W{w}-D{d}-L{l}  |  {pts} pts  |  GF {gf}  GA {ga}  GD {gf-ga:+d}\n")
-        out.insert(tk.END, f"  Games: {len(team_games)}  |  PPG: {pts/max(1,len(team_games)):.2f}\n\n")
-        out.insert(tk.END, f"  {'Home':<28} {'Away':<28} {'Result':<6}\n")
-        out.insert(tk.END, f"  {'-'*64}\n")
+        rows.append(f"\n  SEASON #{sn+1}: {team}\n")
+        rows.append(f"  {'='*55}\n")
+        rows.append(f"  Record: W{w}-D{d}-L{l}  |  {pts} pts  |  GF {gf}  GA {ga}  GD {gf-ga:+d}\n")
+        rows.append(f"  Games: {n_games}  |  PPG: {pts/max(1,n_games):.2f}\n\n")
+        rows.append(f"  {'Home':<28} {'Away':<28} {'Result':<6}\n")
+        rows.append(f"  {'-'*64}\n")
+
+        for o, home_side, x, y in zip(opp_names, at_home.tolist(), gf_g.tolist(), ga_g.tolist()):
+            if home_side: rows.append(f"  {team[:27]:<28} {o[:27]:<28} {x}-{y:<4}\n")
+            else: rows.append(f"  {o[:27]:<28} {team[:27]:<28} {y}-{x:<4}\n")
 
         bw = (0,"",""); bl = (0,"","")
-        for h,a,hg,ag in team_games:
-            out.insert(tk.END, f"  {h[:27]:<28} {a[:27]:<28} {hg}-{ag:<4}\n")
-            if team==h:
-                if hg-ag > bw[0]: bw = (hg-ag, a, f"{hg}-{ag}")
-                if ag-hg > bl[0]: bl = (ag-hg, a, f"{hg}-{ag}")
-            else:
-                if ag-hg > bw[0]: bw = (ag-hg, h, f"{ag}-{hg}")
-                if hg-ag > bl[0]: bl = (hg-ag, h, f"{hg}-{ag}")
-
-        out.insert(tk.END, f"\n  Biggest win:  +{bw[0]} vs {bw[1]} ({bw[2]})\n")
-        out.insert(tk.END, f"  Biggest loss: -{bl[0]} vs {bl[1]} ({bl[2]})\n")
+        margin = gf_g - ga_g
+        if n_games and margin.max() > 0:
+            i = margin.argmax(); bw = (int(margin[i]), opp_names[i], f"{gf_g[i]}-{ga_g[i]}")
+        if n_games and margin.min() < 0:
+            i = margin.argmin(); x, y = (gf_g[i], ga_g[i]) if at_home[i] else (ga_g[i], gf_g[i])
+            bl = (int(-margin[i]), opp_names[i], f"{x}-{y}")
+
+        rows.append(f"\n  Biggest win:  +{bw[0]} vs {bw[1]} ({bw[2]})\n")
+        rows.append(f"  Biggest loss: -{bl[0]} vs {bl[1]} ({bl[2]})\n")
+        out.insert(tk.END, ''.join(rows))
         self.season_status.config(text=f"Season {sn+1}/{n_sims}")
 
     def _show_extremes(self):
-        if self.sim.last_game_logs is None:
+        run = self.season_run
+        if run is None:
             self.season_status.config(text="Run a simulation first!"); return
         team = self.season_team.get()
         if not team: return
 
-        all_logs = self.sim.last_game_logs; out = self.season_output; out.delete(1.0, tk.END)
-        out.insert(tk.END, f"\n  EXTREME RESULTS: {team} (across {len(all_logs):,} seasons)\n")
-        out.insert(tk.END, f"  {'='*55}\n\n")
-
-        wins = []; losses = []
-        for si, logs in enumerate(all_logs):
-            for h,a,hg,ag in logs:
-                if h==team and hg>ag: wins.append((hg-ag, a, f"{hg}-{ag}", si+1))
-                elif a==team and ag>hg: wins.append((ag-hg, h, f"{ag}-{hg}", si+1))
-                if h==team and ag>hg: losses.append((ag-hg, a, f"{hg}-{ag}", si+1))
-                elif a==team and hg>ag: losses.append((hg-ag, h, f"{hg}-{ag}", si+1))
+        out = self.season_output; out.delete(1.0, tk.END)
+        rows = []
+        rows.append(f"\n  EXTREME RESULTS: {team} (across {run.n_sims:,} seasons)\n")
+        rows.append(f"  {'='*55}\n\n")
 
-        wins.sort(key=lambda x: -x[0]); losses.sort(key=lambda x: -x[0])
+        wins, losses = run.extreme_results(team, 12)
 
-        out.insert(tk.END, f"  BIGGEST WINS:\n")
+        rows.append(f"  BIGGEST WINS:\n")
         for margin, opp, score, sn in wins[:12]:
-            out.insert(tk.END, f"    +{margin:<3} {score:<6} vs {opp:<28} (s{sn})\n")
-        out.insert(tk.END, f"\n  BIGGEST LOSSES:\n")
+            rows.append(f"    +{margin:<3} {score:<6} vs {opp:<28} (s{sn})\n")
+        rows.append(f"\n  BIGGEST LOSSES:\n")
         for margin, opp, score, sn in losses[:12]:
-            out.insert(tk.END, f"    -{margin:<3} {score:<6} vs {opp:<28} (s{sn})\n")
+            rows.append(f"    -{margin:<3} {score:<6} vs {opp:<28} (s{sn})\n")
+        out.insert(tk.END, ''.join(rows))
 
     # ─── WHAT-IF SCENARIOS ───
     def _build_whatif_tab(self, parent=None):
@@ -579,15 +653,9 @@ class SimulatorUI:
         ttk.Label(ctrl, text="Custom League:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=(10,0))
 
         # Build team+year list from data
-        all_teams_year = []
-        for team in self.sim.get_all_historic_teams():
-            for yr in range(2022, 2026):
-                if team in self.sim.get_historic_teams(yr, 'PL') or team in self.sim.get_historic_teams(yr, 'ESL') or team in self.sim.get_historic_teams(yr, 'ESB'):
-                    all_teams_year.append(f"{team} ({yr})")
-                    break
-            else:
-                all_teams_year.append(team)  # fallback if no year found
-        all_teams_year.sort()
+        first_season = self.sim.get_first_seasons()
+        all_teams_year = sorted(f"{team} ({first_season[team]})" if team in first_season else team
+                                for team in self.sim.get_all_historic_teams())
 
         self.wi_team_entry = ttk.Combobox(ctrl, values=all_teams_year, width=30, font=('Segoe UI', 9))
         self.wi_team_entry.grid(row=2, column=1, columnspan=2, padx=2, pady=(10,0))
@@ -610,42 +678,40 @@ class SimulatorUI:
 
         sorted_teams, sim_records, _, n_sims, teams = result
         out = self.whatif_output; out.delete(1.0, tk.END)
-        out.insert(tk.END, f"\n  REPLAY: {lg} {yr} — {n_sims:,} full seasons from scratch\n")
-        out.insert(tk.END, f"  {'='*75}\n\n")
-        for rank, t in enumerate(sorted_teams, 1):
-            recs = sim_records[t]
-            avg_pts = np.mean([r['pts'] for r in recs])
-            mn, mx = np.min([r['pts'] for r in recs]), np.max([r['pts'] for r in recs])
-            avg_gd = np.mean([r['gd'] for r in recs])
-            champ = sum(1 for r in recs if r['pos']==1)/n_sims
-            rel = sum(1 for r in recs if r['pos']>=len(teams)-1)/n_sims
+        rows = []
+        rows.append(f"\n  REPLAY: {lg} {yr} — {n_sims:,} full seasons from scratch\n")
+        rows.append(f"  {'='*75}\n\n")
+        cols = self.sim.summary_columns(sorted_teams, sim_records)
+        for i, t in enumerate(sorted_teams):
+            champ, rel = cols['champ'][i], cols['rel'][i]
             tags = ""
             if champ>0.3: tags=" CHAMPION"
             elif rel>0.5: tags=" RELEGATED"
-            out.insert(tk.END, f"  {rank:2d}. {t[:30]:<31} {avg_pts:5.1f} pts ({mn:.0f}-{mx:.0f})  GD {avg_gd:+7.1f}  C:{champ:.0%}  R:{rel:.0%}{tags}\n")
+            rows.append(f"  {i+1:2d}. {t[:30]:<31} {cols['avg_pts'][i]:5.1f} pts ({cols['min_pts'][i]:.0f}-{cols['max_pts'][i]:.0f})"
+                        f"  GD {cols['avg_gd'][i]:+7.1f}  C:{champ:.0%}  R:{rel:.0%}{tags}\n")
+        out.insert(tk.END, ''.join(rows))
 
     def _sim_historic_match(self):
         h = self.wi_home.get(); a = self.wi_away.get()
         if not h or not a or h == a: return
         out = self.whatif_output; out.delete(1.0, tk.END)
+        rows = []
         h_elo = self.sim.elo.ratings.get(h, 1500); a_elo = self.sim.elo.ratings.get(a, 1500)
 
-        n = 5000; results = {'H':0,'D':0,'A':0}; gh=ga=0
-        for _ in range(n):
-            hg, ag = self.sim.sim_match(h, a)
-            if hg>ag: results['H']+=1
-            elif ag>hg: results['A']+=1
-            else: results['D']+=1
-            gh+=hg; ga+=ag
-
-        out.insert(tk.END, f"\n  HISTORIC MATCHUP: {h}  vs  {a}\n")
-        out.insert(tk.END, f"  {'='*60}\n\n")
-        out.insert(tk.END, f"  ELO: {h_elo:.0f}  vs  {a_elo:.0f}  (diff: {h_elo-a_elo:+.0f})\n\n")
-        out.insert(tk.END, f"  {n:,} simulations:\n")
-        out.insert(tk.END, f"    {h} win:  {results['H']/n:.1%}  ({results['H']:,})\n")
-        out.insert(tk.END, f"    Draw:       {results['D']/n:.1%}  ({results['D']:,})\n")
-        out.insert(tk.END, f"    {a} win:  {results['A']/n:.1%}  ({results['A']:,})\n")
-        out.insert(tk.END, f"\n  Avg goals: {gh/n:.2f} - {ga/n:.2f}\n")
+        n = 5000
+        hg, ag = self.sim.sim_matches(h, a, n)
+        results = {'H': int((hg>ag).sum()), 'D': int((hg==ag).sum()), 'A': int((hg<ag).sum())}
+        gh, ga = int(hg.sum()), int(ag.sum())
+
+        rows.append(f"\n  HISTORIC MATCHUP: {h}  vs  {a}\n")
+        rows.append(f"  {'='*60}\n\n")
+        rows.append(f"  ELO: {h_elo:.0f}  vs  {a_elo:.0f}  (diff: {h_elo-a_elo:+.0f})\n\n")
+        rows.append(f"  {n:,} simulations:\n")
+        rows.append(f"    {h} win:  {results['H']/n:.1%}  ({results['H']:,})\n")
+        rows.append(f"    Draw:       {results['D']/n:.1%}  ({results['D']:,})\n")
+        rows.append(f"    {a} win:  {results['A']/n:.1%}  ({results['A']:,})\n")
+        rows.append(f"\n  Avg goals: {gh/n:.2f} - {ga/n:.2f}\n")
+        out.insert(tk.END, ''.join(rows))
 
     def _add_custom_team(self):
         t = self.wi_team_entry.get().strip()
@@ -666,20 +732,17 @@ class SimulatorUI:
         teams = list(self.custom_teams)
         result = self.sim.sim_custom_league(teams, 500)
         if not result: return
-        sim_records, n_sims = result
-        avg_pos = {t: np.mean([r['pos'] for r in sim_records[t]]) for t in teams}
-        sorted_teams = sorted(teams, key=lambda t: avg_pos[t])
+        sorted_teams, sim_records, n_sims = result
 
         out = self.whatif_output; out.delete(1.0, tk.END)
-        out.insert(tk.END, f"\n  CUSTOM LEAGUE: {len(teams)} teams — {n_sims:,} simulations\n")
-        out.insert(tk.END, f"  {'='*70}\n\n")
-        for rank, t in enumerate(sorted_teams, 1):
-            recs = sim_records[t]
-            avg_pts = np.mean([r['pts'] for r in recs])
-            mn, mx = np.min([r['pts'] for r in recs]), np.max([r['pts'] for r in recs])
-            avg_gd = np.mean([r['gd'] for r in recs])
-            champ = sum(1 for r in recs if r['pos']==1)/n_sims
-            out.insert(tk.END, f"  {rank:2d}. {t[:35]:<36} {avg_pts:5.1f} pts ({mn:.0f}-{mx:.0f})  GD {avg_gd:+7.1f}  Win: {champ:.0%}\n")
+        rows = []
+        rows.append(f"\n  CUSTOM LEAGUE: {len(teams)} teams — {n_sims:,} simulations\n")
+        rows.append(f"  {'='*70}\n\n")
+        cols = self.sim.summary_columns(sorted_teams, sim_records)
+        for i, t in enumerate(sorted_teams):
+            rows.append(f"  {i+1:2d}. {t[:35]:<36} {cols['avg_pts'][i]:5.1f} pts ({cols['min_pts'][i]:.0f}-{cols['max_pts'][i]:.0f})"
+                        f"  GD {cols['avg_gd'][i]:+7.1f}  Win: {cols['champ'][i]:.0%}\n")
+        out.insert(tk.END, ''.join(rows))
         self.custom_label.config(text=f"Simulated {len(teams)} teams")
 
 